@@ -0,0 +1,210 @@
+import io
+import sys
+import json
+import time
+import random
+import hashlib
+import zipfile
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 本地替身服务器：提供合成的版本清单、版本 JSON、资源索引和 jar，离线测量安装流程
+VERSION_ID = "bench-1.0"
+# 服务器按这个块大小写出响应，并据此做带宽整形
+WRITE_CHUNK = 64 * 1024
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+# 生成指定大小的 jar；内容不压缩，文件大小接近目标值
+def make_jar(rng, size, entries=None):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as jar:
+        for name, data in (entries or {}).items():
+            jar.writestr(name, data)
+        jar.writestr("payload.bin", rng.randbytes(max(size, 0)))
+    return buffer.getvalue()
+
+
+# 生成一个完整版本需要的全部文件；同一组参数和种子总是生成相同的数据
+class SyntheticRepository:
+    def __init__(self, base_url, assets=1000, libraries=40, client_size=20 * 1024 * 1024, seed=1):
+        self.base_url = base_url
+        self.files = {}
+        rng = random.Random(seed)
+
+        # 资源文件大小大致呈对数正态分布：大量几 KB 的小文件和少量上 MB 的声音文件
+        objects = {}
+        for i in range(assets):
+            size = min(int(rng.lognormvariate(9.5, 1.3)), 4 * 1024 * 1024)
+            data = rng.randbytes(size)
+            hash_ = _sha1(data)
+            self.files[f"/resources/{hash_[:2]}/{hash_}"] = data
+            folder = "sounds" if i % 4 == 0 else "textures"
+            objects[f"minecraft/{folder}/bench/{i}"] = {"hash": hash_, "size": len(data)}
+        asset_index = json.dumps({"objects": objects}).encode()
+
+        library_list = []
+        for i in range(libraries):
+            path = f"com/example/bench/lib{i}/1.0/lib{i}-1.0.jar"
+            library_list.append({
+                "name": f"com.example.bench:lib{i}:1.0",
+                "downloads": {"artifact": self._add(f"/libraries/{path}", make_jar(rng, int(rng.lognormvariate(12, 1))),
+                                                    path=path)}
+            })
+        native_path = "com/example/bench/natives/1.0/natives-1.0-natives-{}.jar"
+        library_list.append({
+            "name": "com.example.bench:natives:1.0",
+            "downloads": {"classifiers": {
+                f"natives-{name}": self._add(
+                    f"/libraries/{native_path.format(name)}",
+                    make_jar(rng, 0, {f"libbench{i}.so": rng.randbytes(256 * 1024) for i in range(4)}),
+                    path=native_path.format(name)
+                ) for name in ("linux", "windows", "osx")
+            }},
+            "natives": {"linux": "natives-linux", "windows": "natives-windows", "osx": "natives-osx"},
+            "extract": {"exclude": ["META-INF/"]}
+        })
+
+        version_json = {
+            "id": VERSION_ID,
+            "type": "release",
+            "mainClass": "net.minecraft.client.main.Main",
+            "assets": "bench",
+            "assetIndex": dict(id="bench", **self._add("/v1/packages/bench-index.json", asset_index)),
+            "downloads": {"client": self._add("/v1/objects/client.jar", make_jar(rng, client_size))},
+            "libraries": library_list,
+            "arguments": {
+                "game": ["--username", "${auth_player_name}", "--version", "${version_name}",
+                         "--gameDir", "${game_directory}", "--assetsDir", "${assets_root}",
+                         "--assetIndex", "${assets_index_name}", "--uuid", "${auth_uuid}",
+                         "--accessToken", "${auth_access_token}"],
+                "jvm": ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]
+            }
+        }
+        version_entry = self._add(f"/v1/packages/{VERSION_ID}.json", json.dumps(version_json).encode())
+        manifest = {
+            "latest": {"release": VERSION_ID, "snapshot": VERSION_ID},
+            "versions": [{
+                "id": VERSION_ID, "type": "release", "url": version_entry["url"],
+                "time": "2024-01-01T00:00:00+00:00", "releaseTime": "2024-01-01T00:00:00+00:00"
+            }]
+        }
+        self._add("/mc/game/version_manifest.json", json.dumps(manifest).encode())
+
+    def _add(self, url_path, data, **extra):
+        self.files[url_path] = data
+        return dict(url=self.base_url + url_path, sha1=_sha1(data), size=len(data), **extra)
+
+    @property
+    def manifest_url(self):
+        return self.base_url + "/mc/game/version_manifest.json"
+
+    @property
+    def resources_url(self):
+        return self.base_url + "/resources"
+
+    def total_size(self):
+        return sum(len(data) for data in self.files.values())
+
+
+# 支持 Range、ETag 和 keep-alive；每个请求先等待 latency 秒，每个连接限速 bandwidth 字节/秒
+class RepositoryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    repository = None
+    latency = 0.0
+    bandwidth = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        data = self.repository.files.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = f'"{_sha1(data)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = 0, len(data) - 1
+        range_header = self.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            first, _, last = range_header[6:].partition("-")
+            start = int(first)
+            end = min(int(last), end) if last else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self._write_shaped(memoryview(data)[start:end + 1])
+
+    def _write_shaped(self, body):
+        began = time.perf_counter()
+        for offset in range(0, len(body), WRITE_CHUNK):
+            self.wfile.write(body[offset:offset + WRITE_CHUNK])
+            if self.bandwidth:
+                ahead = (offset + WRITE_CHUNK) / self.bandwidth - (time.perf_counter() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+def start_server(repository, port=0, latency=0.0, bandwidth=0):
+    handler = type("Handler", (RepositoryHandler,), {
+        "repository": repository, "latency": latency, "bandwidth": bandwidth
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def add_arguments(parser):
+    parser.add_argument("--assets", type=int, default=1000, help="number of asset objects")
+    parser.add_argument("--libraries", type=int, default=40, help="number of library jars")
+    parser.add_argument("--client-size", type=float, default=20, help="client jar size in MiB")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay before every response, in seconds")
+    parser.add_argument("--bandwidth", type=float, default=0, help="per-connection limit in MiB/s (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic Minecraft version for offline benchmarks.")
+    parser.add_argument("--port", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(None, args.port, args.latency, int(args.bandwidth * 1024 * 1024))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    repository = SyntheticRepository(base_url, args.assets, args.libraries, int(args.client_size * 1024 * 1024), args.seed)
+    server.RequestHandlerClass.repository = repository
+    # 第一行输出地址，供基准测试脚本读取
+    print(json.dumps({
+        "url": base_url,
+        "manifest_url": repository.manifest_url,
+        "resources_url": repository.resources_url,
+        "version": VERSION_ID,
+        "total_size": repository.total_size()
+    }), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup import summarize, find_regressions
+from fake_server import add_arguments
+
+import core
+import installer
+import http_client
+import manifest_cache
+from integrity import hash_cache, RACY_WINDOW
+from object_store import object_store
+from launch_profile import compile_launch_profile
+
+
+# 在子进程中启动替身服务器，避免服务器线程与被测代码争抢 GIL
+def start_server(args):
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_server.py"),
+        "--assets", str(args.assets), "--libraries", str(args.libraries), "--client-size", str(args.client_size),
+        "--latency", str(args.latency), "--bandwidth", str(args.bandwidth), "--seed", str(args.seed)
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("Benchmark server failed to start.")
+    return process, json.loads(line)
+
+
+# 让被测代码访问替身服务器，并清空进程内的连接池和各类缓存；fresh 为真时同时删除磁盘上的安装
+def reset_state(server, fresh):
+    if fresh:
+        shutil.rmtree(installer.MINECRAFT_DIR, ignore_errors=True)
+    http_client._client = http_client.HttpClient(mirrors=[])
+    manifest_cache.manifest_cache = manifest_cache.ManifestCache(manifest_url=server["manifest_url"])
+    installer.RESOURCES_URL = server["resources_url"]
+    object_store.__init__()
+    hash_cache.__init__()
+
+
+# 刚写入的文件不会进入哈希缓存；把安装的文件改成较早的修改时间，模拟安装一段时间后的校验
+def age_files(root, seconds):
+    timestamp = time.time() - seconds
+    for directory, _, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(directory, name), (timestamp, timestamp))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_once(server, samples):
+    version = server["version"]
+    reset_state(server, fresh=True)
+    elapsed, manifest = timed(manifest_cache.manifest_cache.get_manifest)
+    if manifest is None:
+        raise RuntimeError("Could not fetch the manifest from the benchmark server.")
+    samples["manifest_fetch"].append(elapsed)
+    samples["manifest_revalidate"].append(timed(manifest_cache.manifest_cache.get_manifest, force=True)[0])
+
+    samples["install_cold"].append(timed(core.install_minecraft_version, version, "original", version)[0])
+    reset_state(server, fresh=False)
+    samples["install_warm"].append(timed(core.install_minecraft_version, version, "original", version)[0])
+
+    if os.path.exists(hash_cache.path):
+        os.remove(hash_cache.path)
+    age_files(installer.MINECRAFT_DIR, RACY_WINDOW + 1)
+    reset_state(server, fresh=False)
+    elapsed, broken = timed(core.verify_minecraft_version, version)
+    if broken:
+        raise RuntimeError(f"{len(broken)} file(s) failed verification after install.")
+    samples["verify_cold"].append(elapsed)
+    samples["verify_warm"].append(timed(core.verify_minecraft_version, version)[0])
+
+    samples["profile_build"].append(timed(compile_launch_profile, version)[0])
+
+    # 首次安装到可以启动的时间：声音和音乐推迟到之后补齐
+    reset_state(server, fresh=True)
+    samples["install_playable"].append(
+        timed(core.install_minecraft_version, version, "original", version, defer_background=True)[0]
+    )
+    samples["install_background"].append(timed(core.finish_minecraft_version, version)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure manifest fetch, install, verification and launch "
+                                                 "profile build time against a local stand-in server.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workdir", help="directory to install into (default: a temporary directory)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="fail if slower than this earlier results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pyl-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    process, server = start_server(args)
+    samples = {name: [] for name in (
+        "manifest_fetch", "manifest_revalidate", "install_cold", "install_warm",
+        "verify_cold", "verify_warm", "profile_build", "install_playable", "install_background"
+    )}
+    try:
+        # 启动器的所有路径都相对于工作目录
+        os.chdir(workdir)
+        for _ in range(args.runs):
+            run_once(server, samples)
+    finally:
+        process.kill()
+        os.chdir(ROOT)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    metrics = {name: summarize(values) for name, values in samples.items()}
+    metrics["install_cold"]["throughput_mib_s"] = round(
+        server["total_size"] / (1024 * 1024) / (metrics["install_cold"]["median_ms"] / 1000), 2
+    )
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "assets": args.assets,
+            "libraries": args.libraries,
+            "client_size_mib": args.client_size,
+            "latency_s": args.latency,
+            "bandwidth_mib_s": args.bandwidth,
+            "total_size": server["total_size"]
+        },
+        "metrics": metrics
+    }
+
+    output = json.dumps(results, indent=4)
+    print(output)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+# 在全新的解释器中导入 main 模块的耗时（秒）
+def measure_import(workdir):
+    result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=workdir, env=_env(),
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+# 从启动进程到主窗口首次绘制的耗时（秒）
+def measure_first_paint(workdir, timeout):
+    env = _env()
+    env["PYL_STARTUP_BENCHMARK"] = "1"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py")], cwd=workdir, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in process.stdout:
+            if line.strip() == "first_paint":
+                elapsed = time.perf_counter() - start
+                process.wait(timeout=timeout)
+                return elapsed
+        raise RuntimeError("Launcher exited before the first paint.")
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def summarize(samples):
+    samples_ms = [round(sample * 1000, 2) for sample in samples]
+    return {"median_ms": statistics.median(samples_ms), "min_ms": min(samples_ms), "runs_ms": samples_ms}
+
+
+# 与基线比较，中位数变慢超过容忍比例即视为回退
+def find_regressions(results, baseline, tolerance):
+    regressions = []
+    for name, summary in results["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if previous and summary["median_ms"] > previous["median_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: {summary['median_ms']}ms > {previous['median_ms']}ms (+{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure launcher import time and time to first paint.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workdir", default=ROOT, help="directory the launcher runs in (needs languages/)")
+    parser.add_argument("--skip-paint", action="store_true", help="only measure import time (no display needed)")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="fail if slower than this earlier results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    metrics = {"import": summarize([measure_import(args.workdir) for _ in range(args.runs)])}
+    if not args.skip_paint:
+        metrics["first_paint"] = summarize([measure_first_paint(args.workdir, args.timeout) for _ in range(args.runs)])
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": metrics
+    }
+
+    output = json.dumps(results, indent=4)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import sys
+import json
+import time
+import argparse
+from core import (
+    LauncherError, get_minecraft_versions, install_minecraft_version, launch_minecraft, verify_minecraft_version,
+    repair_minecraft_version, upgrade_minecraft_version, run_batch
+)
+from jvm_tuning import GC_PRESETS, DEFAULT_GC_PRESET
+from metrics import metrics
+
+# 命令行模式：不需要显示器，可以用脚本批量安装、启动和校验版本
+DEFAULT_JOBS = 4
+
+
+# 批量清单：JSON 列表，每一项为版本号字符串或 {"version", "type", "loader_version", "name", "account"} 对象
+def load_batch_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    return [{"version": entry} if isinstance(entry, str) else entry for entry in entries]
+
+
+def collect_tasks(args):
+    tasks = [{"version": version} for version in args.versions]
+    if args.manifest:
+        tasks.extend(load_batch_manifest(args.manifest))
+    if not tasks:
+        raise SystemExit("No versions given. Pass version ids or --manifest FILE.")
+    return tasks
+
+
+def report(task, result):
+    if isinstance(result, LauncherError):
+        print(f"[FAIL] {task['version']}: {result}", flush=True)
+    else:
+        print(f"[ OK ] {task['version']}", flush=True)
+
+
+def command_list(args):
+    if args.installed:
+        from data_store import InstalledDataStore
+        for version in InstalledDataStore().list_versions():
+            print(f"{version['name']}\t{version['type']}\t{version['display_name']}")
+        return 0
+    for entry in get_minecraft_versions():
+        if args.type in (None, entry.get("type")):
+            print(f"{entry['id']}\t{entry.get('type', '')}\t{entry.get('releaseTime', '')[:10]}")
+    return 0
+
+
+def command_install(args):
+    from data_store import InstalledDataStore
+    store = InstalledDataStore()
+
+    def install(task):
+        install_type = task.get("type", args.type)
+        display_name = task.get("name", task["version"])
+        version_config = install_minecraft_version(task["version"], install_type, display_name,
+                                                   loader_version=task.get("loader_version", args.loader_version))
+        # 模组加载器安装到自己的版本 id，记录实际安装的版本
+        if not store.has_version(version_config["name"]):
+            store.add_version(version_config["name"], display_name, install_type)
+
+    results = run_batch(install, collect_tasks(args), args.jobs, report)
+    return 1 if any(isinstance(result, LauncherError) for _, result in results) else 0
+
+
+def command_launch(args):
+    def launch(task):
+        return launch_minecraft(task["version"], "", task.get("account", args.account), args.gc, not args.no_appcds)
+
+    results = run_batch(launch, collect_tasks(args), args.jobs, report)
+    instances = [result for _, result in results if not isinstance(result, LauncherError)]
+
+    # 等待所有实例退出，期间转发日志
+    positions = {instance.id: 0 for instance in instances}
+    while any(instance.is_running() for instance in instances) or not args.quiet and any(
+        instance.line_count > positions[instance.id] for instance in instances
+    ):
+        for instance in instances:
+            lines, positions[instance.id] = instance.read_lines(positions[instance.id])
+            if not args.quiet:
+                for line in lines:
+                    print(f"[{instance.name}] {line}")
+        time.sleep(0.2)
+
+    failed = len(results) - len(instances)
+    for instance in instances:
+        startup_time = instance.startup_time()
+        startup = f"{startup_time:.1f}s" if startup_time is not None else "n/a"
+        print(f"{instance.name}: exit code {instance.exit_code}, startup {startup}")
+        if instance.exit_code != 0:
+            failed += 1
+    return 1 if failed else 0
+
+
+def command_verify(args):
+    def verify(task):
+        if args.repair:
+            repaired = repair_minecraft_version(task["version"])
+            if repaired:
+                print(f"{task['version']}: repaired {len(repaired)} file(s)", flush=True)
+            return
+        broken = verify_minecraft_version(task["version"])
+        for artifact in broken:
+            print(f"{task['version']}: bad {artifact['path']}", flush=True)
+        if broken:
+            raise LauncherError(f"{len(broken)} file(s) missing or corrupt")
+
+    results = run_batch(verify, collect_tasks(args), args.jobs, report)
+    return 1 if any(isinstance(result, LauncherError) for _, result in results) else 0
+
+
+def command_upgrade(args):
+    from data_store import InstalledDataStore
+    store = InstalledDataStore()
+
+    # 保留旧版本时新增一条记录，否则把旧版本的记录切换到新版本（模组加载器版本的 id 与游戏版本号不同）
+    def switch(version_config):
+        if store.has_version(args.old) and not args.keep_old:
+            store.replace_version(args.old, version_config["name"])
+        else:
+            store.add_version(version_config["name"], version_config["displayName"], version_config["type"])
+
+    summary = upgrade_minecraft_version(args.old, args.new, switch, keep_old=args.keep_old)
+    mib = 1024 * 1024
+    print(f"Upgraded {args.old} -> {args.new}: downloaded {summary['downloaded_files']} file(s) "
+          f"({summary['downloaded_bytes'] / mib:.1f} MiB), reused {summary['reused_files']} file(s) "
+          f"({summary['reused_bytes'] / mib:.1f} MiB)")
+    for name in ("assets", "libraries"):
+        diff = summary[name]
+        print(f"  {name}: {diff['added']} added, {diff['changed']} changed, {diff['removed']} removed, "
+              f"{diff['unchanged']} unchanged")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pyl", description="Headless PyL launcher.")
+    parser.add_argument("--metrics-jsonl", help="append timing spans to this JSON lines file")
+    parser.add_argument("--metrics-prom", help="write counters and timings to this Prometheus text file on exit")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="list available or installed versions")
+    list_parser.add_argument("--installed", action="store_true")
+    list_parser.add_argument("--type", help="only show this version type (release, snapshot, ...)")
+    list_parser.set_defaults(func=command_list)
+
+    for name, func, help_text in (
+        ("install", command_install, "install versions"),
+        ("launch", command_launch, "launch installed versions and wait for them to exit"),
+        ("verify", command_verify, "check installed files against their SHA1"),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("versions", nargs="*")
+        sub.add_argument("--manifest", help="JSON batch file with many versions/instances")
+        sub.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help="how many run at the same time")
+        sub.set_defaults(func=func)
+        if name == "install":
+            sub.add_argument("--type", choices=["original", "forge", "fabric", "quilt"], default="original")
+            sub.add_argument("--loader-version", help="mod loader version (default: recommended/latest stable)")
+        if name == "launch":
+            sub.add_argument("--account", default="offline_user")
+            sub.add_argument("--gc", choices=list(GC_PRESETS), default=DEFAULT_GC_PRESET)
+            sub.add_argument("--no-appcds", action="store_true")
+            sub.add_argument("-q", "--quiet", action="store_true", help="do not print game output")
+        if name == "verify":
+            sub.add_argument("--repair", action="store_true", help="re-download missing or corrupt files")
+    upgrade_parser = subparsers.add_parser("upgrade", help="move an installed version to another version, "
+                                                           "downloading only new or changed files")
+    upgrade_parser.add_argument("old")
+    upgrade_parser.add_argument("new")
+    upgrade_parser.add_argument("--keep-old", action="store_true", help="keep the old version installed")
+    upgrade_parser.set_defaults(func=command_upgrade)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics_jsonl:
+        metrics.open_jsonl(args.metrics_jsonl)
+    try:
+        return args.func(args)
+    except LauncherError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        metrics.close()
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
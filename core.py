@@ -0,0 +1,321 @@
+import os
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from supervisor import supervisor
+from jvm_tuning import tuned_jvm_options, DEFAULT_GC_PRESET
+from metrics import metrics
+
+# 启动器核心流程：不依赖 Qt，图形界面（main.py）和命令行（cli.py）共用
+
+
+# 核心流程出错时抛出，由调用方负责向用户展示消息
+class LauncherError(Exception):
+    pass
+
+
+# 获取 Minecraft 版本列表（清单条目，包含 id、type、releaseTime）
+# 网络相关模块在第一次使用时才导入，不拖慢启动
+def get_minecraft_versions():
+    from manifest_cache import manifest_cache
+    manifest = manifest_cache.get_manifest()
+    if manifest is None:
+        raise LauncherError("Failed to fetch Minecraft versions.")
+    return manifest["versions"]
+
+
+# 下载 Minecraft 版本
+def download_minecraft_version(version):
+    from manifest_cache import manifest_cache
+    if manifest_cache.get_manifest() is None:
+        raise LauncherError("Failed to fetch version manifest.")
+    if manifest_cache.get_entry(version) is None:
+        raise LauncherError(f"Version {version} not found.")
+
+    version_json = manifest_cache.get_version_json(version)
+    if version_json is None:
+        raise LauncherError("Failed to fetch version details.")
+    return version_json
+
+
+# 下载并安装 Minecraft 版本（可在后台线程中执行）
+# install_type 为 forge、fabric 或 quilt 时同时安装对应的模组加载器，loader_version 为空则使用推荐版本
+# 加载器安装为继承原版的独立版本（如 1.20.1-fabric-0.15.11），与原版和其他加载器互不覆盖
+# defer_background 为真时声音和音乐推迟下载：返回后即可启动，之后调用 finish_minecraft_version 补齐
+# 返回版本配置，其中 name 是实际安装的版本 id；取消的新安装会删除已下载的部分
+def install_minecraft_version(version, install_type, display_name, progress=None, cancel_event=None,
+                              loader_version=None, defer_background=False):
+    from installer import remove_version_files
+    from loaders import LOADERS, LoaderError, prepare_loader
+    with metrics.span("install", version=version, install_type=install_type):
+        with metrics.span("install.manifest"):
+            version_json = download_minecraft_version(version)
+
+        # 加载器的库与原版文件一起并行下载
+        plan = None
+        if install_type in LOADERS:
+            try:
+                with metrics.span("install.loader_resolve", loader=install_type):
+                    plan = prepare_loader(install_type, version, loader_version)
+            except LoaderError as e:
+                raise LauncherError(f"Failed to resolve {install_type} for Minecraft {version}: {e}")
+        target = plan["id"] if plan else version
+        installed = os.path.isfile(_version_config_path(target))
+
+        try:
+            _install_files(version, version_json, plan, target, progress, cancel_event, defer_background)
+        except BaseException:
+            # 已安装过的同名版本保持不变
+            if cancel_event is not None and cancel_event.is_set() and not installed:
+                remove_version_files(target)
+                # 加载器版本的 JSON 尚未写入时找不到它继承的原版，未安装的原版目录单独清理
+                if target != version and not os.path.isfile(_version_config_path(version)):
+                    remove_version_files(version)
+            raise
+
+    # 创建版本配置文件
+    version_config = {
+        "name": target,
+        "type": install_type,
+        "displayName": display_name
+    }
+    if plan:
+        version_config["loader"] = {"name": plan["loader"], "version": plan["version"]}
+    if defer_background:
+        version_config["pendingDownloads"] = True
+    _write_version_config(target, version_config)
+    return version_config
+
+
+# 下载原版和加载器的文件，执行加载器安装步骤并编译 target 的启动配置
+def _install_files(version, version_json, plan, target, progress, cancel_event, defer_background):
+    import requests
+    from installer import install_version_files
+    from launch_profile import compile_launch_profile
+    from loaders import LoaderError, finish_loader
+    try:
+        with metrics.span("install.download") as span:
+            failures = install_version_files(version, version_json, progress=progress, cancel_event=cancel_event,
+                                             extra_artifacts=plan["artifacts"] if plan else (),
+                                             defer_background=defer_background, owner=target)
+            span["failures"] = len(failures)
+    except (OSError, requests.RequestException) as e:
+        raise LauncherError(f"Failed to download Minecraft version: {e}")
+    if failures:
+        raise LauncherError(f"Failed to download {len(failures)} file(s) of Minecraft {version}.")
+
+    if plan:
+        try:
+            with metrics.span("install.loader_finish", loader=plan["loader"]):
+                finish_loader(plan, version, cancel_event)
+        except (OSError, LoaderError) as e:
+            raise LauncherError(f"Failed to install {plan['loader']} for Minecraft {version}: {e}")
+
+    # 安装时就编译好启动配置，启动时不再解析版本 JSON
+    try:
+        with metrics.span("install.profile"):
+            compile_launch_profile(target)
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        raise LauncherError(f"Failed to prepare launch profile for {target}: {e}")
+
+
+def _version_config_path(version):
+    return os.path.join(".minecraft", "versions", version, "version.json")
+
+
+def _write_version_config(version, version_config):
+    with open(_version_config_path(version), "w", encoding="utf-8") as f:
+        json.dump(version_config, f, indent=4)
+
+
+# 版本是否还有安装时推迟、尚未补齐的文件
+def has_pending_downloads(version):
+    try:
+        with open(_version_config_path(version), "r", encoding="utf-8") as f:
+            return bool(json.load(f).get("pendingDownloads"))
+    except (OSError, json.JSONDecodeError):
+        return False
+
+
+# 以较低的并发数补齐安装时推迟的文件（声音和音乐）；游戏可以同时运行。返回推迟下载的文件数
+def finish_minecraft_version(version, progress=None, cancel_event=None):
+    import requests
+    from installer import install_background_files, PRIORITY_BACKGROUND
+    with metrics.span("install.background", version=version) as span:
+        artifacts = _installed_artifacts(version)
+        pending = [artifact for artifact in artifacts if artifact.get("priority") == PRIORITY_BACKGROUND]
+        span["files"] = len(pending)
+        try:
+            failures = install_background_files(version, artifacts, progress=progress, cancel_event=cancel_event)
+        except (OSError, requests.RequestException) as e:
+            raise LauncherError(f"Failed to download the remaining files of {version}: {e}")
+    if failures:
+        raise LauncherError(f"Failed to download {len(failures)} remaining file(s) of Minecraft {version}.")
+
+    try:
+        with open(_version_config_path(version), "r", encoding="utf-8") as f:
+            version_config = json.load(f)
+        version_config.pop("pendingDownloads", None)
+        _write_version_config(version, version_config)
+    except (OSError, json.JSONDecodeError) as e:
+        raise LauncherError(f"Version {version} is not installed correctly: {e}")
+    return len(pending)
+
+
+# 把已安装的版本升级到另一个版本：只下载新增或变化的文件，旧版本的文件直接复用
+# 新版本安装完成后以新版本配置调用 switch，原子地切换版本记录；任何一步失败都删除新版本，旧版本保持不变
+# 返回升级统计（复用和下载的文件数与字节数、资源和库的差异）
+def upgrade_minecraft_version(old_version, new_version, switch=None, progress=None, cancel_event=None,
+                              keep_old=False):
+    from installer import remove_version_files
+    from loaders import LOADERS, LoaderError, prepare_loader
+    from object_store import object_store
+    from upgrade import plan_upgrade, seed_store, summarize, is_installed
+    if not is_installed(old_version):
+        raise LauncherError(f"Version {old_version} is not installed.")
+    with open(_version_config_path(old_version), "r", encoding="utf-8") as f:
+        old_config = json.load(f)
+    install_type = old_config.get("type", "original")
+
+    # 模组加载器版本升级为新游戏版本上推荐的加载器，安装到它自己的版本 id
+    loader_plan = None
+    if install_type in LOADERS:
+        try:
+            loader_plan = prepare_loader(install_type, new_version)
+        except LoaderError as e:
+            raise LauncherError(f"Failed to resolve {install_type} for Minecraft {new_version}: {e}")
+    target = loader_plan["id"] if loader_plan else new_version
+    if target == old_version or is_installed(target):
+        raise LauncherError(f"Version {target} is already installed.")
+    display_name = old_config.get("displayName", old_version)
+    if display_name == old_version:
+        display_name = target
+
+    with metrics.span("upgrade", old_version=old_version, new_version=target) as span:
+        try:
+            try:
+                with metrics.span("upgrade.plan"):
+                    version_json = download_minecraft_version(new_version)
+                    plan = plan_upgrade(old_version, new_version, version_json, loader_plan)
+                    seed_store(plan)
+            except (OSError, KeyError, json.JSONDecodeError) as e:
+                raise LauncherError(f"Failed to plan the upgrade from {old_version} to {target}: {e}")
+            summary = summarize(plan)
+            span.update(reused_bytes=summary["reused_bytes"], downloaded_bytes=summary["downloaded_bytes"])
+
+            version_config = install_minecraft_version(new_version, install_type, display_name, progress, cancel_event,
+                                                       loader_version=loader_plan and loader_plan["version"])
+            if switch:
+                switch(version_config)
+        except BaseException:
+            # 回滚：删除新版本，已复用的对象仍被旧版本引用；
+            # 两个版本共用路径的文件（同名资源索引）已被新版本覆盖，从对象库重新链接旧版本的文件
+            remove_version_files(target)
+            object_store.restore(old_version)
+            raise
+
+    if not keep_old:
+        remove_version_files(old_version)
+    return summary
+
+
+# 启动 Minecraft，不等待游戏退出；返回由 supervisor 监控的实例
+def launch_minecraft(version, install_type, account_name, gc_preset=DEFAULT_GC_PRESET, use_appcds=True):
+    from launch_profile import load_launch_profile, build_command
+    version_dir = os.path.join(".minecraft", "versions", version)
+    if not os.path.exists(version_dir):
+        raise LauncherError(f"Version {version} not found.")
+
+    with metrics.span("launch", version=version, gc=gc_preset):
+        try:
+            profile = load_launch_profile(version)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            raise LauncherError(f"Version {version} is incomplete, please reinstall it: {e}")
+
+        # 启动命令：堆大小、GC 和 AppCDS 按机器与版本调优
+        command = build_command(profile, account_name, tuned_jvm_options(version_dir, profile, gc_preset, use_appcds))
+        try:
+            return supervisor.launch(f"{version} ({account_name})", command, cwd=profile["gameDirectory"])
+        except OSError as e:
+            raise LauncherError(f"Failed to launch Minecraft: {e}")
+
+
+# 已安装版本应有的全部文件（含模组加载器的库）
+def _installed_artifacts(version):
+    from installer import build_artifact_list, asset_index_artifact
+    from launch_profile import load_version_json
+    try:
+        # 合并了模组加载器的版本 JSON，加载器的库也一并校验
+        version_json = load_version_json(version)
+        with open(asset_index_artifact(version_json)["path"], "r", encoding="utf-8") as f:
+            asset_index = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise LauncherError(f"Version {version} is not installed correctly: {e}")
+    return build_artifact_list(version, version_json, asset_index)
+
+
+# 校验已安装版本的文件；返回缺失或哈希不匹配的文件列表
+# 哈希按文件缓存，未变化的文件不再重新计算
+def verify_minecraft_version(version):
+    from integrity import verify_artifacts
+    with metrics.span("verify", version=version) as span:
+        artifacts = _installed_artifacts(version)
+        broken = verify_artifacts(artifacts)
+        span.update(files=len(artifacts), broken=len(broken))
+    return broken
+
+
+# 校验并重新下载缺失或损坏的文件；返回修复的文件列表
+def repair_minecraft_version(version, progress=None, cancel_event=None):
+    import requests
+    from integrity import verify_artifacts, check_artifact
+    from downloader import download_all
+    from installer import store_entries
+    from object_store import object_store
+    with metrics.span("repair.verify", version=version):
+        artifacts = _installed_artifacts(version)
+        broken = verify_artifacts(artifacts)
+    if not broken:
+        return []
+
+    # 与安装相同：先登记将要链接的全部对象，修复期间删除其他版本不会回收它们
+    object_store.register(version, store_entries(artifacts))
+    for artifact in broken:
+        # 硬链接的文件与对象库共用数据，对象库中损坏的对象同样要删除后重新下载
+        sha1 = artifact.get("sha1")
+        if sha1 and object_store.has(sha1):
+            stored = {"path": object_store.object_path(sha1), "sha1": sha1, "size": artifact.get("size")}
+            if not check_artifact(stored):
+                os.remove(stored["path"])
+        if os.path.exists(artifact["path"]):
+            os.remove(artifact["path"])
+
+    try:
+        with metrics.span("repair.download", version=version, files=len(broken)):
+            failures = download_all(broken, progress=progress, store=object_store, cancel_event=cancel_event)
+    except (OSError, requests.RequestException) as e:
+        raise LauncherError(f"Failed to repair Minecraft {version}: {e}")
+    finally:
+        object_store.register(version, store_entries(artifacts, linked_only=True))
+    if failures:
+        raise LauncherError(f"Failed to repair {len(failures)} file(s) of Minecraft {version}.")
+    return broken
+
+
+# 以有限的并发数对多个任务执行同一操作；返回 [(任务, 结果或 LauncherError)]，顺序与完成顺序一致
+# 单个任务的任何异常都只让该任务失败，不中断整批任务
+def run_batch(func, tasks, max_workers, on_done=None):
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except LauncherError as e:
+                result = e
+            except Exception as e:
+                result = LauncherError(f"{type(e).__name__}: {e}")
+            results.append((futures[future], result))
+            if on_done:
+                on_done(futures[future], result)
+    return results
@@ -0,0 +1,141 @@
+import os
+import json
+import sqlite3
+import threading
+
+DATABASE_PATH = "launcher.db"
+LEGACY_DATA_PATH = "versions.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    display_name TEXT NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS versions_name ON versions (name);
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS instances (
+    name TEXT PRIMARY KEY,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# 已安装版本、账户和实例信息的持久化存储；每次修改都是一个独立的 SQLite 事务
+class InstalledDataStore:
+    def __init__(self, path=DATABASE_PATH, legacy_path=LEGACY_DATA_PATH):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        # WAL 模式下提交只追加日志，进程崩溃不会损坏已提交的数据
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate_legacy_data()
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    # 一次性把旧的 versions.json 导入数据库，导入成功后重命名旧文件
+    def _migrate_legacy_data(self):
+        if self._query("SELECT value FROM meta WHERE key = 'migrated_versions_json'"):
+            return
+        statements = []
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        for version in data.get("versions", []):
+            statements.append((
+                "INSERT INTO versions (name, display_name, type) VALUES (?, ?, ?)",
+                (version["name"], version.get("display_name", version["name"]), version.get("type", ""))
+            ))
+        for account in data.get("accounts", []):
+            statements.append(("INSERT INTO accounts (name) VALUES (?)", (account["name"],)))
+        statements.append(("INSERT INTO meta (key, value) VALUES ('migrated_versions_json', '1')", ()))
+        self._transaction(statements)
+        if os.path.exists(self.legacy_path):
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def list_versions(self):
+        return self._query("SELECT id, name, display_name, type FROM versions ORDER BY id")
+
+    def has_versions(self):
+        return bool(self._query("SELECT 1 FROM versions LIMIT 1"))
+
+    def has_version(self, name):
+        return bool(self._query("SELECT 1 FROM versions WHERE name = ? LIMIT 1", (name,)))
+
+    def add_version(self, name, display_name, install_type):
+        self._transaction([(
+            "INSERT INTO versions (name, display_name, type) VALUES (?, ?, ?)", (name, display_name, install_type)
+        )])
+
+    def remove_version(self, name):
+        self._transaction([
+            ("DELETE FROM versions WHERE name = ?", (name,)),
+            ("DELETE FROM instances WHERE name = ?", (name,))
+        ])
+
+    # 升级时在同一个事务中把版本记录和实例信息切换到新版本；未改过的显示名称随版本号更新
+    def replace_version(self, old_name, new_name):
+        self._transaction([
+            ("UPDATE versions SET display_name = ? WHERE name = ? AND display_name = name", (new_name, old_name)),
+            ("UPDATE versions SET name = ? WHERE name = ?", (new_name, old_name)),
+            ("UPDATE instances SET name = ? WHERE name = ?", (new_name, old_name))
+        ])
+
+    def list_accounts(self):
+        return self._query("SELECT id, name FROM accounts ORDER BY id")
+
+    def first_account(self):
+        accounts = self._query("SELECT id, name FROM accounts ORDER BY id LIMIT 1")
+        return accounts[0] if accounts else None
+
+    def add_account(self, name):
+        self._transaction([("INSERT INTO accounts (name) VALUES (?)", (name,))])
+
+    def rename_account(self, account_id, name):
+        self._transaction([("UPDATE accounts SET name = ? WHERE id = ?", (name, account_id))])
+
+    def remove_account(self, account_id):
+        self._transaction([("DELETE FROM accounts WHERE id = ?", (account_id,))])
+
+    # 实例信息：每个版本的启动设置等，以 JSON 保存；没有记录时返回 None
+    def get_instance(self, name):
+        rows = self._query("SELECT metadata FROM instances WHERE name = ?", (name,))
+        return json.loads(rows[0]["metadata"]) if rows else None
+
+    def set_instance(self, name, metadata):
+        self._transaction([(
+            "INSERT INTO instances (name, metadata) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET metadata = excluded.metadata",
+            (name, json.dumps(metadata))
+        )])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_client import get_client
+from metrics import metrics
+
+# 每次写入磁盘的块大小
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_WORKERS = 16
+# 超过该大小且大小已知的文件拆分为多个分段并行下载
+SEGMENT_THRESHOLD = 16 * 1024 * 1024
+SEGMENT_COUNT = 4
+# 单个文件的最大尝试次数
+MAX_ATTEMPTS = 3
+# 每写入这么多字节就落盘并保存一次下载进度
+STATE_INTERVAL = 4 * 1024 * 1024
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+
+def file_sha1(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+# 已存在且大小、哈希都匹配的文件无需重新下载
+def is_up_to_date(artifact):
+    path = artifact["path"]
+    if not os.path.isfile(path):
+        return False
+    if artifact.get("size") is not None and os.path.getsize(path) != artifact["size"]:
+        return False
+    if artifact.get("sha1"):
+        return file_sha1(path) == artifact["sha1"]
+    return True
+
+
+class RangeNotSupported(IOError):
+    pass
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def _load_state(state_path, artifact):
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if state.get("url") != artifact["url"] or state.get("sha1") != artifact.get("sha1"):
+        return None
+    return state
+
+
+def _save_state(state_path, state):
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+# 新建下载状态：已知大小的大文件拆分为多个分段
+def _new_state(artifact, segmented):
+    size = artifact.get("size")
+    segments = []
+    if segmented and size and size >= SEGMENT_THRESHOLD:
+        step = -(-size // SEGMENT_COUNT)
+        for start in range(0, size, step):
+            segments.append({"start": start, "end": min(start + step, size) - 1, "done": 0})
+    else:
+        segments.append({"start": 0, "end": None, "done": 0})
+    return {"url": artifact["url"], "sha1": artifact.get("sha1"), "segments": segments}
+
+
+# 下载一个分段；数据落盘后才记录进度，崩溃后进度不会超过磁盘上的实际数据
+def _fetch_segment(client, url, part_path, segment, state, state_path, lock, on_bytes, hasher):
+    offset = segment["start"] + segment["done"]
+    if segment["end"] is not None and offset > segment["end"]:
+        return
+    headers = {}
+    if offset > 0 or segment["end"] is not None:
+        end = "" if segment["end"] is None else str(segment["end"])
+        headers["Range"] = f"bytes={offset}-{end}"
+
+    with client.stream(url, headers=headers) as response:
+        if headers and response.status_code != 206:
+            raise RangeNotSupported(f"Server ignored Range request for {url}")
+        with open(part_path, "r+b") as f:
+            f.seek(offset)
+            unsaved = 0
+            # 写盘耗时单独统计，用来区分网络慢还是磁盘慢
+            disk_time = 0.0
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    write_start = time.perf_counter()
+                    f.write(chunk)
+                    disk_time += time.perf_counter() - write_start
+                    if hasher:
+                        hasher.update(chunk)
+                    unsaved += len(chunk)
+                    if on_bytes:
+                        on_bytes(len(chunk))
+                    if unsaved >= STATE_INTERVAL:
+                        write_start = time.perf_counter()
+                        f.flush()
+                        os.fsync(f.fileno())
+                        disk_time += time.perf_counter() - write_start
+                        with lock:
+                            segment["done"] += unsaved
+                            _save_state(state_path, state)
+                        unsaved = 0
+            except BaseException:
+                # 连接中断时记录已写入的数据，下次从断点继续
+                f.flush()
+                with lock:
+                    segment["done"] += unsaved
+                    _save_state(state_path, state)
+                raise
+            finally:
+                metrics.incr("disk_write_seconds_total", disk_time)
+            with lock:
+                segment["done"] += unsaved
+
+
+def _fetch_all_segments(client, artifact, part_path, state, state_path, on_bytes):
+    lock = threading.Lock()
+    segments = state["segments"]
+    # 从头开始的单段下载可以边写边计算哈希，省去完成后的重新读取
+    hasher = hashlib.sha1() if len(segments) == 1 and segments[0]["done"] == 0 else None
+    if len(segments) == 1:
+        if artifact.get("size") and segments[0]["done"] >= artifact["size"]:
+            return None
+        _fetch_segment(client, artifact["url"], part_path, segments[0], state, state_path, lock, on_bytes, hasher)
+        return hasher
+
+    with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+        futures = [
+            executor.submit(_fetch_segment, client, artifact["url"], part_path, segment, state, state_path, lock, on_bytes, None)
+            for segment in segments
+        ]
+        for future in futures:
+            future.result()
+    return None
+
+
+# 下载单个文件到暂存文件，支持断点续传和分段并行；哈希校验通过后才原子替换到目标路径
+def download_file(client, artifact, on_bytes=None, segmented=True):
+    path = artifact["path"]
+    part_path = path + PART_SUFFIX
+    state_path = path + STATE_SUFFIX
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    state = _load_state(state_path, artifact) if os.path.exists(part_path) else None
+    if state is None:
+        state = _new_state(artifact, segmented)
+        with open(part_path, "wb") as f:
+            if artifact.get("size") and len(state["segments"]) > 1:
+                f.truncate(artifact["size"])
+    elif on_bytes:
+        on_bytes(sum(segment["done"] for segment in state["segments"]))
+
+    # 连接中断时从已保存的进度继续，网络层会为重试挑选当前最好的镜像
+    attempts = 0
+    while True:
+        try:
+            hasher = _fetch_all_segments(client, artifact, part_path, state, state_path, on_bytes)
+            break
+        except RangeNotSupported:
+            # 服务器不支持 Range，丢弃暂存数据后整体重新下载
+            state = _new_state(artifact, segmented=False)
+            with open(part_path, "wb"):
+                pass
+        except requests.RequestException:
+            attempts += 1
+            if attempts >= MAX_ATTEMPTS:
+                raise
+            metrics.incr("download_retries_total")
+
+    if artifact.get("sha1"):
+        digest = hasher.hexdigest() if hasher else file_sha1(part_path)
+        if digest != artifact["sha1"]:
+            metrics.incr("download_hash_mismatches_total")
+            os.remove(part_path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            raise IOError(f"SHA1 mismatch for {artifact['url']}")
+
+    os.replace(part_path, path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    metrics.incr("downloads_total")
+    metrics.incr("download_bytes_total", os.path.getsize(path))
+    return os.path.getsize(path)
+
+
+# 对象库中已有的对象直接链接到目标路径，缺失的才下载到对象库
+def fetch_into_store(client, store, artifact, on_bytes=None):
+    sha1 = artifact["sha1"]
+    path = artifact["path"]
+    size = artifact.get("size") or 0
+    if store.is_linked(sha1, path):
+        metrics.incr("store_hits_total")
+        if on_bytes:
+            on_bytes(size)
+        return
+    with store.object_lock(sha1):
+        if not store.has(sha1):
+            if is_up_to_date(artifact):
+                store.adopt(sha1, path)
+            else:
+                download_file(client, dict(artifact, path=store.object_path(sha1)), on_bytes)
+                size = 0
+    if on_bytes and size:
+        on_bytes(size)
+    store.link(sha1, path)
+
+
+# 通过有界线程池并发下载所有文件；返回失败的 (artifact, 异常) 列表
+# 按 priority 从小到大提交，线程池先进先出，启动游戏必需的文件先下载
+# 设置 cancel_event 后尚未开始的文件不再下载，正在下载的文件在下一个数据块处中止
+def download_all(artifacts, max_workers=DEFAULT_WORKERS, progress=None, client=None, store=None, cancel_event=None):
+    client = client or get_client()
+    total = sum(artifact.get("size") or 0 for artifact in artifacts)
+    done = [0]
+    lock = threading.Lock()
+
+    def on_bytes(count):
+        if cancel_event is not None and cancel_event.is_set():
+            raise DownloadCancelled()
+        with lock:
+            done[0] += count
+            current = done[0]
+        if progress:
+            progress(current, total)
+
+    def run(artifact):
+        if cancel_event is not None and cancel_event.is_set():
+            raise DownloadCancelled()
+        sha1 = artifact.get("sha1")
+        if store is not None and sha1:
+            fetch_into_store(client, store, artifact, on_bytes)
+            return
+        if is_up_to_date(artifact):
+            on_bytes(artifact.get("size") or 0)
+            return
+        download_file(client, artifact, on_bytes)
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        ordered = sorted(artifacts, key=lambda artifact: artifact.get("priority", 0))
+        futures = {executor.submit(run, artifact): artifact for artifact in ordered}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except (requests.RequestException, IOError) as e:
+                failures.append((futures[future], e))
+            except DownloadCancelled:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+    return failures
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import metrics
+
+# 连接超时和读取超时（秒）
+DEFAULT_TIMEOUT = (10, 30)
+# 每个主机同时进行的请求数
+MAX_CONNECTIONS_PER_HOST = 16
+POOL_SIZE = 32
+# 单个镜像的重试次数；重试用完后切换到下一个镜像
+RETRIES = 2
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# 镜像失败后的冷却时间（秒），冷却期内排在其他镜像之后
+FAILURE_COOLDOWN = 60
+# 延迟和吞吐量的平滑系数
+SMOOTHING = 0.3
+# 排序时假定的典型文件大小，以及还没有测量数据时使用的估计值
+TYPICAL_SIZE = 256 * 1024
+DEFAULT_LATENCY = 0.5
+DEFAULT_THROUGHPUT = 1024 * 1024
+
+# 镜像配置：JSON 列表，每项为 {"name": ..., "rewrites": {"官方地址前缀": "镜像地址前缀", ...}}
+# 例如 {"name": "bmclapi", "rewrites": {"https://launchermeta.mojang.com": "https://bmclapi2.bangbang93.com"}}
+MIRRORS_PATH = os.path.join(".minecraft", "mirrors.json")
+
+
+class HostStats:
+    def __init__(self):
+        self.latency = None
+        self.throughput = None
+        self.failures = 0
+        self.failed_at = None
+
+    def _smooth(self, old, new):
+        return new if old is None else SMOOTHING * new + (1 - SMOOTHING) * old
+
+    def record_latency(self, seconds):
+        self.latency = self._smooth(self.latency, seconds)
+        self.failures = 0
+
+    def record_throughput(self, bytes_per_second):
+        self.throughput = self._smooth(self.throughput, bytes_per_second)
+
+    def record_failure(self):
+        self.failures += 1
+        self.failed_at = time.monotonic()
+
+    # 预计下载一个典型文件所需的时间，越小越好
+    def score(self):
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY
+        throughput = self.throughput if self.throughput is not None else DEFAULT_THROUGHPUT
+        score = latency + TYPICAL_SIZE / throughput
+        if self.failed_at is not None and time.monotonic() - self.failed_at < FAILURE_COOLDOWN:
+            score += FAILURE_COOLDOWN * self.failures
+        return score
+
+
+def load_mirrors(path=MIRRORS_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+# 共享的网络层：连接池、超时、退避重试、每主机并发限制，以及按实测延迟和吞吐量排序的镜像
+class HttpClient:
+    def __init__(self, mirrors=None):
+        self.mirrors = load_mirrors() if mirrors is None else mirrors
+        self.session = requests.Session()
+        retry = Retry(
+            total=RETRIES, backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]), raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._semaphores = {}
+
+    def stats(self, host):
+        with self._lock:
+            return self._stats.setdefault(host, HostStats())
+
+    def _semaphore(self, host):
+        with self._lock:
+            return self._semaphores.setdefault(host, threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST))
+
+    # 官方地址及所有镜像的候选地址，按主机得分从好到差排列
+    def candidates(self, url):
+        urls = [url]
+        for mirror in self.mirrors:
+            for prefix, replacement in mirror["rewrites"].items():
+                if url.startswith(prefix):
+                    urls.append(replacement + url[len(prefix):])
+                    break
+        return sorted(urls, key=lambda candidate: self.stats(urlsplit(candidate).netloc).score())
+
+    def _request(self, url, headers, stream):
+        host = urlsplit(url).netloc
+        semaphore = self._semaphore(host)
+        semaphore.acquire()
+        try:
+            response = self.session.get(url, headers=headers, stream=stream, timeout=DEFAULT_TIMEOUT)
+        except requests.RequestException:
+            semaphore.release()
+            self.stats(host).record_failure()
+            metrics.incr("http_failures_total", host=host)
+            raise
+        # urllib3 在同一个镜像上重试过的次数
+        retries = response.raw.retries if response.raw is not None else None
+        if retries is not None and retries.history:
+            metrics.incr("http_retries_total", len(retries.history), host=host)
+        metrics.incr("http_requests_total", host=host, status=response.status_code)
+        # 镜像缺少文件或出错时同样切换到下一个候选地址
+        if response.status_code >= 400:
+            response.close()
+            semaphore.release()
+            self.stats(host).record_failure()
+            metrics.incr("http_failures_total", host=host)
+            raise requests.HTTPError(f"{response.status_code} Error for url: {url}", response=response)
+        # 从发出请求到收到响应头的时间，包含 DNS、连接和 TLS 握手
+        self.stats(host).record_latency(response.elapsed.total_seconds())
+        metrics.observe("http_response_seconds", response.elapsed.total_seconds(), host=host)
+        return response, semaphore, host
+
+    # 依次尝试各候选地址，返回第一个成功的响应；semaphore 需要在读完响应后释放
+    def _open(self, url, headers, stream):
+        error = None
+        for candidate in self.candidates(url):
+            if error is not None:
+                metrics.incr("http_failovers_total", host=urlsplit(candidate).netloc)
+            try:
+                return self._request(candidate, headers, stream)
+            except requests.RequestException as e:
+                error = e
+        raise error
+
+    def get(self, url, headers=None):
+        response, semaphore, host = self._open(url, headers, stream=False)
+        semaphore.release()
+        metrics.incr("http_bytes_total", len(response.content), host=host)
+        return response
+
+    # 流式下载：读完响应体后释放主机并发名额，并记录吞吐量
+    @contextmanager
+    def stream(self, url, headers=None):
+        response, semaphore, host = self._open(url, headers, stream=True)
+        start = time.monotonic()
+        try:
+            yield response
+        except requests.RequestException:
+            self.stats(host).record_failure()
+            raise
+        finally:
+            response.close()
+            semaphore.release()
+        elapsed = time.monotonic() - start
+        length = response.raw.tell() if response.raw is not None else 0
+        metrics.incr("http_bytes_total", length, host=host)
+        if length >= TYPICAL_SIZE and elapsed > 0:
+            self.stats(host).record_throughput(length / elapsed)
+            metrics.set("http_throughput_bytes_per_second", round(self.stats(host).throughput), host=host)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+# 进程内共享的客户端，第一次使用时才创建
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
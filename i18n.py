@@ -0,0 +1,64 @@
+import os
+import json
+import marshal
+from collections import ChainMap
+
+LANGUAGES_DIR = "languages"
+DEFAULT_LANGUAGE = "english"
+CACHE_DIR = os.path.join(".minecraft", "cache", "i18n")
+
+
+# 翻译目录：当前语言缺少的键逐个回退到英文，英文也没有时直接显示键名
+class Catalog(ChainMap):
+    def __missing__(self, key):
+        return key
+
+
+def catalog_path(lang_code):
+    return os.path.join(LANGUAGES_DIR, f"{lang_code}.json")
+
+
+# 磁盘缓存以语言文件的修改时间和大小为键，语言文件未变化时跳过 JSON 解析
+def _load_compiled(lang_code):
+    try:
+        stat = os.stat(catalog_path(lang_code))
+    except FileNotFoundError:
+        print(f"Language file '{catalog_path(lang_code)}' not found.")
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    cache_path = os.path.join(CACHE_DIR, f"{lang_code}.marshal")
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, messages = marshal.load(f)
+        if cached_key == key:
+            return messages
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    try:
+        with open(catalog_path(lang_code), "r", encoding="utf-8") as f:
+            messages = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Failed to load language file '{catalog_path(lang_code)}': {e}")
+        return {}
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump((key, messages), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return messages
+
+
+_messages = {}
+
+
+# 每种语言只从磁盘加载一次，之后切换语言只是替换内存中的目录
+def load_catalog(lang_code):
+    if lang_code not in _messages:
+        _messages[lang_code] = _load_compiled(lang_code)
+    if lang_code == DEFAULT_LANGUAGE:
+        return Catalog(_messages[lang_code])
+    return Catalog(_messages[lang_code], load_catalog(DEFAULT_LANGUAGE).maps[0])
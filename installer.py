@@ -0,0 +1,214 @@
+import os
+import json
+import shutil
+from rules import rules_allow, natives_classifier
+from downloader import download_all, is_up_to_date, download_file, DEFAULT_WORKERS
+from object_store import object_store
+from http_client import get_client
+
+MINECRAFT_DIR = ".minecraft"
+RESOURCES_URL = "https://resources.download.minecraft.net"
+# 只有 Maven 坐标、没有指定仓库的库默认从这里下载
+LIBRARIES_URL = "https://libraries.minecraft.net/"
+# 下载优先级：数字越小越先下载。客户端、库和 natives 缺一不可；声音和音乐缺失时游戏照常运行，可以在启动后补齐
+PRIORITY_CRITICAL = 0
+PRIORITY_ESSENTIAL = 1
+PRIORITY_BACKGROUND = 2
+# 这些目录下的资源（声音、音乐）最后下载
+BACKGROUND_ASSET_PREFIXES = ("minecraft/sounds/", "minecraft/music/", "sounds/", "music/")
+# 后台补齐资源时的并发数，给前台下载和游戏留出带宽
+BACKGROUND_WORKERS = 4
+
+
+def version_dir(version):
+    return os.path.join(MINECRAFT_DIR, "versions", version)
+
+
+def libraries_dir():
+    return os.path.join(MINECRAFT_DIR, "libraries")
+
+
+def assets_dir():
+    return os.path.join(MINECRAFT_DIR, "assets")
+
+
+# Maven 坐标 group:artifact:version[:classifier][@ext] 对应的相对路径
+def maven_path(name):
+    name, _, extension = name.partition("@")
+    parts = name.split(":")
+    group, artifact, version = parts[:3]
+    classifier = f"-{parts[3]}" if len(parts) > 3 else ""
+    file_name = f"{artifact}-{version}{classifier}.{extension or 'jar'}"
+    return "/".join(group.split(".") + [artifact, version, file_name])
+
+
+def _artifact(download, path):
+    return {"url": download["url"], "path": path, "sha1": download.get("sha1"), "size": download.get("size"),
+            "priority": PRIORITY_CRITICAL}
+
+
+def asset_priority(name):
+    return PRIORITY_BACKGROUND if name.startswith(BACKGROUND_ASSET_PREFIXES) else PRIORITY_ESSENTIAL
+
+
+# 提供客户端 jar 的版本：继承原版的版本（模组加载器）使用原版目录中的客户端
+def jar_version(version, version_json):
+    return version_json.get("jar", version)
+
+
+def client_artifact(version, version_json):
+    jar = jar_version(version, version_json)
+    return _artifact(version_json["downloads"]["client"], os.path.join(version_dir(jar), f"{jar}.jar"))
+
+
+def asset_index_artifact(version_json):
+    index = version_json["assetIndex"]
+    return _artifact(index, os.path.join(assets_dir(), "indexes", f"{index['id']}.json"))
+
+
+# 根据规则筛选当前系统需要的库和 natives
+def library_artifacts(version_json):
+    artifacts = []
+    for library in version_json.get("libraries", []):
+        if not rules_allow(library.get("rules")):
+            continue
+        downloads = library.get("downloads")
+        if downloads is None:
+            # 加载器的库只给出 Maven 坐标和仓库地址（Fabric、Quilt、旧版 Forge）
+            path = maven_path(library["name"])
+            repository = library.get("url") or LIBRARIES_URL
+            artifacts.append({
+                "url": repository.rstrip("/") + "/" + path,
+                "path": os.path.join(libraries_dir(), path),
+                "sha1": library.get("sha1"),
+                "size": library.get("size"),
+                "priority": PRIORITY_CRITICAL
+            })
+            continue
+        # url 为空的库由加载器安装程序生成，不能下载
+        if downloads.get("artifact", {}).get("url"):
+            artifact = downloads["artifact"]
+            artifacts.append(_artifact(artifact, os.path.join(libraries_dir(), artifact["path"])))
+        classifier = natives_classifier(library)
+        if classifier and classifier in downloads.get("classifiers", {}):
+            native = downloads["classifiers"][classifier]
+            artifacts.append(_artifact(native, os.path.join(libraries_dir(), native["path"])))
+    return artifacts
+
+
+# 同一对象被多个资源引用时只下载一次，优先级取其中最高的
+def asset_object_artifacts(asset_index):
+    artifacts = {}
+    for name, asset in asset_index["objects"].items():
+        hash_ = asset["hash"]
+        priority = asset_priority(name)
+        if hash_ in artifacts:
+            artifacts[hash_]["priority"] = min(artifacts[hash_]["priority"], priority)
+            continue
+        artifacts[hash_] = {
+            "url": f"{RESOURCES_URL}/{hash_[:2]}/{hash_}",
+            "path": os.path.join(assets_dir(), "objects", hash_[:2], hash_),
+            "sha1": hash_,
+            "size": asset["size"],
+            "priority": priority
+        }
+    return list(artifacts.values())
+
+
+# 读取资源索引；索引不存在或已损坏时先单独下载
+def load_asset_index(version_json, client=None):
+    artifact = asset_index_artifact(version_json)
+    if not is_up_to_date(artifact):
+        download_file(client or get_client(), artifact)
+    with open(artifact["path"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 构建一次完整安装需要的全部文件列表
+def build_artifact_list(version, version_json, asset_index):
+    artifacts = [client_artifact(version, version_json)]
+    artifacts.extend(library_artifacts(version_json))
+    artifacts.append(asset_index_artifact(version_json))
+    artifacts.extend(asset_object_artifacts(asset_index))
+    return artifacts
+
+
+# 对象库引用条目 [(sha1, 路径)]；linked_only 为真时只包含已经链接到位的文件
+def store_entries(artifacts, linked_only=False):
+    return [
+        (artifact["sha1"], artifact["path"]) for artifact in artifacts
+        if artifact.get("sha1") and (not linked_only or object_store.is_linked(artifact["sha1"], artifact["path"]))
+    ]
+
+
+# 安装版本：保存版本 JSON，并发下载客户端、库、natives 和资源文件；返回失败列表
+# extra_artifacts 是随版本一起下载的其他文件（例如模组加载器的库）
+# defer_background 为真时不下载声音和音乐，之后由 install_background_files 补齐
+# owner 是在对象库中引用这些文件的版本，默认为 version；模组加载器版本以自己的名义引用所继承原版的文件
+def install_version_files(version, version_json, max_workers=DEFAULT_WORKERS, progress=None, cancel_event=None,
+                          extra_artifacts=(), defer_background=False, owner=None):
+    owner = owner or version
+    os.makedirs(version_dir(version), exist_ok=True)
+    with open(os.path.join(version_dir(version), f"{version}.json"), "w", encoding="utf-8") as f:
+        json.dump(version_json, f)
+
+    client = get_client()
+    asset_index = load_asset_index(version_json, client)
+    artifacts = build_artifact_list(version, version_json, asset_index)
+    # 同一路径只下载一次，避免两个线程写同一个暂存文件
+    paths = {artifact["path"] for artifact in artifacts}
+    artifacts.extend(artifact for artifact in extra_artifacts if artifact["path"] not in paths)
+    wanted = [artifact for artifact in artifacts if artifact.get("priority", PRIORITY_CRITICAL) < PRIORITY_BACKGROUND] \
+        if defer_background else artifacts
+    # 先登记将要链接的全部对象，下载期间删除其他版本不会回收本版本正在使用的文件
+    object_store.register(owner, store_entries(artifacts))
+    try:
+        return download_all(wanted, max_workers=max_workers, progress=progress, client=client,
+                            store=object_store, cancel_event=cancel_event)
+    finally:
+        # 只保留已链接的对象（包括被取消或失败的安装），删除版本时据此回收
+        object_store.register(owner, store_entries(artifacts, linked_only=True))
+
+
+# 补齐安装时推迟的文件；artifacts 是版本的完整文件列表，已链接的文件直接跳过。返回失败列表
+def install_background_files(version, artifacts, max_workers=BACKGROUND_WORKERS, progress=None, cancel_event=None):
+    object_store.register(version, store_entries(artifacts))
+    try:
+        return download_all(artifacts, max_workers=max_workers, progress=progress, store=object_store,
+                            cancel_event=cancel_event)
+    finally:
+        object_store.register(version, store_entries(artifacts, linked_only=True))
+
+
+def _inherited_version(version):
+    try:
+        with open(os.path.join(version_dir(version), f"{version}.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("inheritsFrom")
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _is_inherited(version):
+    versions_dir = os.path.join(MINECRAFT_DIR, "versions")
+    names = os.listdir(versions_dir) if os.path.isdir(versions_dir) else []
+    return any(_inherited_version(name) == version for name in names)
+
+
+# 删除版本目录，并释放只被该版本引用的库和资源文件
+# 仍被其他版本继承的原版只删除自己的配置，保留版本 JSON 和客户端；不再被使用的未安装原版目录一并删除
+def remove_version_files(version):
+    parent = _inherited_version(version)
+    object_store.release(version)
+    if _is_inherited(version):
+        kept = {f"{version}.json", f"{version}.jar"}
+        for name in os.listdir(version_dir(version)):
+            if name not in kept:
+                path = os.path.join(version_dir(version), name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+    else:
+        shutil.rmtree(version_dir(version), ignore_errors=True)
+    if parent and not os.path.isfile(os.path.join(version_dir(parent), "version.json")) and not _is_inherited(parent):
+        shutil.rmtree(version_dir(parent), ignore_errors=True)
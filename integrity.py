@@ -0,0 +1,94 @@
+import os
+import json
+import mmap
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_PATH = os.path.join(".minecraft", "cache", "hashes.json")
+# hashlib 计算大块数据时会释放 GIL，多个线程可以同时计算哈希
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+# 修改时间距今不到这么多秒的文件可能仍在写入，同一时间戳内再次修改无法察觉，暂不缓存
+RACY_WINDOW = 2
+
+
+# 通过内存映射读取文件并计算 SHA1，避免逐块复制到 Python 缓冲区
+def mmap_sha1(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha1().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha1(mapped).hexdigest()
+
+
+# 文件哈希缓存：以 (路径, 大小, 修改时间, inode) 为键，文件没有变化时不再重新计算
+class HashCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    # 返回文件的 SHA1；文件不存在时返回 None
+    def sha1(self, path):
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        with self._lock:
+            entry = self._load().get(path)
+        if entry is not None and entry[:3] == key:
+            return entry[3]
+
+        digest = mmap_sha1(path)
+        if time.time() - stat.st_mtime_ns / 1e9 >= RACY_WINDOW:
+            with self._lock:
+                self._entries[path] = key + [digest]
+                self._dirty = True
+        return digest
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+hash_cache = HashCache()
+
+
+# 文件存在、大小一致，且在已知哈希时哈希一致
+def check_artifact(artifact, cache=hash_cache):
+    path = artifact["path"]
+    if not os.path.isfile(path):
+        return False
+    if artifact.get("size") is not None and os.path.getsize(path) != artifact["size"]:
+        return False
+    if artifact.get("sha1"):
+        return cache.sha1(path) == artifact["sha1"]
+    return True
+
+
+# 并行校验所有文件；返回缺失或损坏的文件列表，顺序与输入一致
+def verify_artifacts(artifacts, max_workers=DEFAULT_WORKERS, cache=hash_cache):
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda artifact: check_artifact(artifact, cache), artifacts))
+    cache.save()
+    return [artifact for artifact, ok in zip(artifacts, results) if not ok]
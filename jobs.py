@@ -0,0 +1,124 @@
+import time
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# 同时执行的安装/删除任务数，其余任务在线程池中排队
+MAX_CONCURRENT_JOBS = 2
+# 同时补齐声音等非必需文件的任务数；这些任务使用单独的线程池，不占用安装任务的名额
+MAX_BACKGROUND_DOWNLOADS = 1
+# 进度信号的最小发送间隔（秒），避免刷屏拖慢界面
+PROGRESS_INTERVAL = 0.1
+# 计算下载速度时的平滑系数
+SPEED_SMOOTHING = 0.3
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobSignals(QObject):
+    started = pyqtSignal()
+    # 已完成量、总量、速度（单位/秒）、剩余时间（秒，未知时为 -1）
+    progress = pyqtSignal(object, object, float, float)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+# 后台任务：func(job) 在线程池中执行，通过 job.report 汇报进度，通过 job.cancel_event 感知取消
+class Job(QRunnable):
+    def __init__(self, title, func):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.title = title
+        self.func = func
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+        self.state = "queued"
+        self._last_emit = 0
+        self._last_done = 0
+        self._last_time = None
+        self._speed = 0.0
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report(self, done, total):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        now = time.monotonic()
+        if now - self._last_emit < PROGRESS_INTERVAL and done < total:
+            return
+        if self._last_time is not None and now > self._last_time:
+            speed = (done - self._last_done) / (now - self._last_time)
+            self._speed = speed if self._speed == 0 else SPEED_SMOOTHING * speed + (1 - SPEED_SMOOTHING) * self._speed
+        self._last_emit = self._last_time = now
+        self._last_done = done
+        eta = (total - done) / self._speed if self._speed > 0 and total else -1
+        self.signals.progress.emit(done, total, self._speed, eta)
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self.state = "cancelled"
+            self.signals.cancelled.emit()
+            return
+        self.state = "running"
+        self.signals.started.emit()
+        try:
+            result = self.func(self)
+        except Exception as e:
+            if self.cancel_event.is_set():
+                self.state = "cancelled"
+                self.signals.cancelled.emit()
+            else:
+                self.state = "failed"
+                self.signals.failed.emit(str(e))
+            return
+        self.state = "finished"
+        self.signals.finished.emit(result)
+
+
+# 任务管理：排队执行安装等重任务，轻量任务（如获取版本清单）直接进入全局线程池
+class JobManager(QObject):
+    job_added = pyqtSignal(object)
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_JOBS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_concurrent)
+        self.background_download_pool = QThreadPool(self)
+        self.background_download_pool.setMaxThreadCount(MAX_BACKGROUND_DOWNLOADS)
+        self.jobs = []
+        # 轻量任务也要保留引用，直到执行结束
+        self._background = []
+
+    # background_download 为真时在单独的线程池中执行，不会挡住之后提交的安装、修复和删除
+    def submit(self, job, background_download=False):
+        self.jobs.append(job)
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *args, job=job: self._forget(job))
+        self.job_added.emit(job)
+        (self.background_download_pool if background_download else self.pool).start(job)
+        return job
+
+    def run_in_background(self, job):
+        self._background.append(job)
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *args, job=job: self._forget(job))
+        QThreadPool.globalInstance().start(job)
+        return job
+
+    def _forget(self, job):
+        for jobs in (self.jobs, self._background):
+            if job in jobs:
+                jobs.remove(job)
+
+    def cancel_all(self):
+        for job in self.jobs + self._background:
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.pool.waitForDone()
+        self.background_download_pool.waitForDone()
+        QThreadPool.globalInstance().waitForDone()
@@ -0,0 +1,127 @@
+import os
+import re
+import sys
+import hashlib
+import subprocess
+from functools import lru_cache
+
+MB = 1024 * 1024
+# 原版客户端的基础堆大小，以及每个模组额外需要的内存
+BASE_HEAP_MB = 2048
+HEAP_PER_MOD_MB = 48
+MIN_HEAP_MB = 1024
+MAX_HEAP_MB = 16384
+# 单个实例最多使用可用内存的比例，给系统和其他实例留出空间
+MAX_AVAILABLE_FRACTION = 0.75
+# 初始堆较小，多个实例共用一台机器时不会一启动就占满内存
+INITIAL_HEAP_MB = 512
+
+# 经过验证的 GC 预设：G1 参数与官方启动器一致，ZGC 需要 Java 15 以上
+GC_PRESETS = {
+    "g1": [
+        "-XX:+UseG1GC", "-XX:+UnlockExperimentalVMOptions", "-XX:G1NewSizePercent=20",
+        "-XX:G1ReservePercent=20", "-XX:MaxGCPauseMillis=50", "-XX:G1HeapRegionSize=32M"
+    ],
+    "zgc": ["-XX:+UseZGC"]
+}
+GC_MIN_JAVA = {"g1": 8, "zgc": 15}
+DEFAULT_GC_PRESET = "g1"
+# -XX:ArchiveClassesAtExit（动态 AppCDS）从 Java 13 开始支持
+APPCDS_MIN_JAVA = 13
+
+
+# 系统当前可用的物理内存（字节），无法获取时返回 None
+def available_memory():
+    try:
+        if sys.platform.startswith("win"):
+            import ctypes
+
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong)
+                ]
+
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+            return status.ullAvailPhys
+        if sys.platform == "darwin":
+            return vm_stat_available(subprocess.run(["vm_stat"], capture_output=True, text=True).stdout)
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+# macOS 没有 MemAvailable，以空闲页加非活跃页（可直接回收）估算；hw.memsize 是物理内存总量，不能代替
+def vm_stat_available(output):
+    page_size = re.search(r"page size of (\d+) bytes", output)
+    pages = dict(re.findall(r"^Pages (free|inactive):\s+(\d+)\.", output, re.MULTILINE))
+    if not page_size or len(pages) < 2:
+        return None
+    return (int(pages["free"]) + int(pages["inactive"])) * int(page_size.group(1))
+
+
+def count_mods(game_dir):
+    try:
+        return sum(1 for name in os.listdir(os.path.join(game_dir, "mods")) if name.endswith(".jar"))
+    except OSError:
+        return 0
+
+
+# 根据可用内存和模组数量计算最大堆（MB），按 256MB 取整
+def heap_size_mb(available_bytes, mod_count):
+    wanted = BASE_HEAP_MB + HEAP_PER_MOD_MB * mod_count
+    if available_bytes:
+        wanted = min(wanted, int(available_bytes / MB * MAX_AVAILABLE_FRACTION))
+    wanted = max(MIN_HEAP_MB, min(MAX_HEAP_MB, wanted))
+    return wanted // 256 * 256
+
+
+# java 的主版本号（8、17、21...），无法执行 java 时返回 None
+@lru_cache(maxsize=None)
+def java_major_version(java="java"):
+    try:
+        output = subprocess.run([java, "-version"], capture_output=True, text=True, timeout=30).stderr
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r'version "(\d+)(?:\.(\d+))?', output)
+    if not match:
+        return None
+    major = int(match.group(1))
+    return int(match.group(2)) if major == 1 and match.group(2) else major
+
+
+def gc_options(preset, java_version):
+    if java_version is not None and java_version < GC_MIN_JAVA.get(preset, 8):
+        preset = DEFAULT_GC_PRESET
+    return list(GC_PRESETS.get(preset, GC_PRESETS[DEFAULT_GC_PRESET]))
+
+
+# AppCDS 归档按类路径和 Java 版本区分；首次启动在退出时生成，之后的启动直接复用
+def appcds_options(version_dir, profile, java_version):
+    if java_version is None or java_version < APPCDS_MIN_JAVA:
+        return []
+    key = "\0".join([str(java_version), profile["mainClass"]] + profile["jvmArguments"])
+    archive = os.path.abspath(os.path.join(version_dir, f"appcds-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.jsa"))
+    if os.path.isfile(archive):
+        return [f"-XX:SharedArchiveFile={archive}"]
+    return [f"-XX:ArchiveClassesAtExit={archive}"]
+
+
+# 某个版本的完整 JVM 调优参数
+def tuned_jvm_options(version_dir, profile, gc_preset=DEFAULT_GC_PRESET, use_appcds=True):
+    java_version = java_major_version()
+    heap = heap_size_mb(available_memory(), count_mods(profile["gameDirectory"]))
+    options = [f"-Xmx{heap}M", f"-Xms{min(heap, INITIAL_HEAP_MB)}M"]
+    options.extend(gc_options(gc_preset, java_version))
+    if use_appcds:
+        options.extend(appcds_options(version_dir, profile, java_version))
+    return options
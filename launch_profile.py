@@ -0,0 +1,222 @@
+import os
+import re
+import json
+import uuid
+import shutil
+import hashlib
+import zipfile
+from rules import rules_allow, natives_classifier, os_name, os_arch
+from installer import MINECRAFT_DIR, version_dir, libraries_dir, assets_dir, maven_path, jar_version
+
+LAUNCHER_NAME = "PyL"
+LAUNCHER_VERSION = "1.0"
+# 启动配置格式变化时递增，使旧的启动配置失效
+PROFILE_FORMAT = 2
+PROFILE_FILE = "launch_profile.json"
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+# 旧版本（只有 minecraftArguments）默认的 JVM 参数
+LEGACY_JVM_ARGUMENTS = ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]
+
+
+def profile_path(version):
+    return os.path.join(version_dir(version), PROFILE_FILE)
+
+
+def version_json_path(version):
+    return os.path.join(version_dir(version), f"{version}.json")
+
+
+def library_key(library):
+    group, artifact, *rest = library["name"].partition("@")[0].split(":")
+    return group, artifact, rest[1] if len(rest) > 1 else None
+
+
+# 按 inheritsFrom 的规则合并：子版本的库排在前面并替换同名库，参数追加，其他字段覆盖
+def merge_version_json(parent, child):
+    merged = dict(parent)
+    for key, value in child.items():
+        if key == "libraries":
+            libraries = {}
+            for library in value + parent.get("libraries", []):
+                libraries.setdefault(library_key(library), library)
+            merged["libraries"] = list(libraries.values())
+        elif key == "arguments":
+            merged["arguments"] = {
+                name: parent.get("arguments", {}).get(name, []) + value.get(name, [])
+                for name in ("game", "jvm")
+            }
+        elif key != "inheritsFrom":
+            merged[key] = value
+    return merged
+
+
+# 按 inheritsFrom 逐级读取并合并版本 JSON；返回合并后的 JSON 和继承链上的版本（从自身到原版）
+# 子版本没有自己的客户端，jar 字段指向提供客户端的版本
+def resolve_version_json(version):
+    with open(version_json_path(version), "r", encoding="utf-8") as f:
+        version_json = json.load(f)
+    parent_version = version_json.get("inheritsFrom")
+    if not parent_version:
+        return version_json, [version]
+    parent, chain = resolve_version_json(parent_version)
+    parent = dict(parent, jar=parent.get("jar", parent_version))
+    return merge_version_json(parent, version_json), [version] + chain
+
+
+def load_version_json(version):
+    return resolve_version_json(version)[0]
+
+
+# 启动配置的输入：继承链上每个版本 JSON 的大小和修改时间、系统、目录位置；任何一项变化都需要重新编译
+def profile_inputs(chain):
+    version_json = []
+    for version in chain:
+        stat = os.stat(version_json_path(version))
+        version_json.append([version, stat.st_size, stat.st_mtime_ns])
+    return {
+        "format": PROFILE_FORMAT,
+        "version_json": version_json,
+        "os": [os_name(), os_arch()],
+        "root": os.path.abspath(MINECRAFT_DIR)
+    }
+
+
+def _collect_arguments(arguments):
+    result = []
+    for argument in arguments:
+        if isinstance(argument, str):
+            result.append(argument)
+        elif rules_allow(argument.get("rules")):
+            value = argument["value"]
+            result.extend([value] if isinstance(value, str) else value)
+    return result
+
+
+def _library_path(library):
+    artifact = library.get("downloads", {}).get("artifact")
+    if artifact:
+        return os.path.join(libraries_dir(), artifact["path"])
+    return os.path.join(libraries_dir(), maven_path(library["name"]))
+
+
+# 解压当前系统需要的 natives 到版本目录
+def extract_natives(version_json, natives_dir):
+    shutil.rmtree(natives_dir, ignore_errors=True)
+    os.makedirs(natives_dir, exist_ok=True)
+    for library in version_json.get("libraries", []):
+        if not rules_allow(library.get("rules")):
+            continue
+        classifier = natives_classifier(library)
+        native = library.get("downloads", {}).get("classifiers", {}).get(classifier)
+        if not native:
+            continue
+        excludes = library.get("extract", {}).get("exclude", [])
+        with zipfile.ZipFile(os.path.join(libraries_dir(), native["path"])) as jar:
+            for name in jar.namelist():
+                if name.endswith("/") or any(name.startswith(prefix) for prefix in excludes):
+                    continue
+                target = os.path.join(natives_dir, os.path.basename(name))
+                with jar.open(name) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+
+
+# 把版本 JSON 编译为可直接启动的配置：类路径、natives、参数模板只解析一次
+def compile_launch_profile(version):
+    version_json, chain = resolve_version_json(version)
+    natives_dir = os.path.abspath(os.path.join(version_dir(version), "natives"))
+    extract_natives(version_json, natives_dir)
+
+    classpath = []
+    for library in version_json.get("libraries", []):
+        if not rules_allow(library.get("rules")):
+            continue
+        if "downloads" in library and "artifact" not in library["downloads"]:
+            continue
+        path = os.path.abspath(_library_path(library))
+        if path not in classpath:
+            classpath.append(path)
+    jar = jar_version(version, version_json)
+    classpath.append(os.path.abspath(os.path.join(version_dir(jar), f"{jar}.jar")))
+
+    if "arguments" in version_json:
+        jvm_arguments = _collect_arguments(version_json["arguments"].get("jvm", []))
+        game_arguments = _collect_arguments(version_json["arguments"].get("game", []))
+    else:
+        jvm_arguments = list(LEGACY_JVM_ARGUMENTS)
+        game_arguments = version_json["minecraftArguments"].split()
+
+    # 静态占位符在编译时替换，只保留与账户相关的占位符
+    values = {
+        "natives_directory": natives_dir,
+        "launcher_name": LAUNCHER_NAME,
+        "launcher_version": LAUNCHER_VERSION,
+        "classpath": os.pathsep.join(classpath),
+        "classpath_separator": os.pathsep,
+        "library_directory": os.path.abspath(libraries_dir()),
+        "version_name": version,
+        "version_type": version_json.get("type", "release"),
+        "game_directory": os.path.abspath(MINECRAFT_DIR),
+        "assets_root": os.path.abspath(assets_dir()),
+        "game_assets": os.path.abspath(assets_dir()),
+        "assets_index_name": version_json.get("assets", ""),
+    }
+    profile = {
+        "inputs": profile_inputs(chain),
+        "mainClass": version_json["mainClass"],
+        "jvmArguments": [substitute(argument, values) for argument in jvm_arguments],
+        "gameArguments": [substitute(argument, values) for argument in game_arguments],
+        "gameDirectory": os.path.abspath(MINECRAFT_DIR)
+    }
+    tmp_path = profile_path(version) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f)
+    os.replace(tmp_path, profile_path(version))
+    return profile
+
+
+# 读取启动配置；不存在或输入已变化时重新编译。继承链取自上次编译，任何一级变化都会使配置失效
+def load_launch_profile(version):
+    try:
+        with open(profile_path(version), "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        inputs = profile["inputs"]
+        if inputs["format"] == PROFILE_FORMAT:
+            chain = [entry[0] for entry in inputs["version_json"]]
+            if inputs == profile_inputs(chain):
+                return profile
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+    return compile_launch_profile(version)
+
+
+def substitute(argument, values):
+    return PLACEHOLDER_PATTERN.sub(lambda m: values.get(m.group(1), m.group(0)), argument)
+
+
+# 与原版启动器一致的离线 UUID：UUID.nameUUIDFromBytes("OfflinePlayer:<name>")
+def offline_uuid(account_name):
+    digest = bytearray(hashlib.md5(f"OfflinePlayer:{account_name}".encode("utf-8")).digest())
+    digest[6] = digest[6] & 0x0f | 0x30
+    digest[8] = digest[8] & 0x3f | 0x80
+    return uuid.UUID(bytes=bytes(digest)).hex
+
+
+# 用账户信息填充启动配置，得到完整的启动命令
+def build_command(profile, account_name, jvm_options=()):
+    values = {
+        "auth_player_name": account_name,
+        "auth_uuid": offline_uuid(account_name),
+        "auth_access_token": "0",
+        "auth_session": "0",
+        "auth_xuid": "0",
+        "clientid": "0",
+        "user_type": "legacy",
+        # 1.7.2 至 1.8.x 的 minecraftArguments 含有 --userProperties，客户端按 JSON 解析，离线账户为空对象
+        "user_properties": "{}"
+    }
+    command = ["java"] + list(jvm_options)
+    command.extend(substitute(argument, values) for argument in profile["jvmArguments"])
+    command.append(profile["mainClass"])
+    command.extend(substitute(argument, values) for argument in profile["gameArguments"])
+    return command
@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import zipfile
+import subprocess
+import requests
+from http_client import get_client
+from downloader import download_file, is_up_to_date, file_sha1
+from installer import MINECRAFT_DIR, version_dir, libraries_dir, maven_path, library_artifacts
+from launch_profile import version_json_path
+
+# 模组加载器安装：从各自的元数据接口解析加载器版本，下载加载器的库，生成继承原版的加载器版本 JSON
+# 与原版启动器一样，每个加载器版本有自己的版本 id 和目录，原版文件仍在原版目录中，多个版本共用
+LOADERS = ("forge", "fabric", "quilt")
+CACHE_DIR = os.path.join(MINECRAFT_DIR, "cache", "loaders")
+# 加载器版本列表的缓存有效期（秒）；具体某个加载器版本的配置不会变化，永久缓存
+VERSIONS_TTL = 600
+
+FABRIC_META_URL = "https://meta.fabricmc.net/v2"
+QUILT_META_URL = "https://meta.quiltmc.org/v3"
+FORGE_FILES_URL = "https://files.minecraftforge.net/net/minecraftforge/forge"
+FORGE_MAVEN_URL = "https://maven.minecraftforge.net/net/minecraftforge/forge"
+
+
+class LoaderError(Exception):
+    pass
+
+
+def _cache_path(*parts):
+    return os.path.join(CACHE_DIR, *parts)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+# 带磁盘缓存的元数据请求；ttl 为 None 表示内容不会变化，网络不可用时退回到过期的缓存
+def _fetch_json(url, cache_path, ttl=None):
+    cached = _read_json(cache_path)
+    if cached is not None and (ttl is None or time.time() - os.path.getmtime(cache_path) < ttl):
+        return cached
+    try:
+        response = get_client().get(url)
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        if cached is not None:
+            return cached
+        raise LoaderError(f"Failed to fetch {url}: {e}")
+    _write_json(cache_path, data)
+    return data
+
+
+# Fabric 和 Quilt 的元数据接口格式相同，加载器配置直接就是继承原版的版本 JSON
+class MetaLoader:
+    def __init__(self, name, meta_url):
+        self.name = name
+        self.meta_url = meta_url
+
+    def _entries(self, game_version):
+        return _fetch_json(
+            f"{self.meta_url}/versions/loader/{game_version}",
+            _cache_path(self.name, f"{game_version}.json"), VERSIONS_TTL
+        )
+
+    def default_version(self, game_version):
+        entries = self._entries(game_version)
+        if not entries:
+            raise LoaderError(f"{self.name} does not support Minecraft {game_version}.")
+        # Quilt 没有 stable 字段，以版本号中的 beta 等标记判断
+        for entry in entries:
+            loader = entry["loader"]
+            if loader.get("stable", "-" not in loader["version"]):
+                return loader["version"]
+        return entries[0]["loader"]["version"]
+
+    def prepare(self, game_version, loader_version):
+        profile = _fetch_json(
+            f"{self.meta_url}/versions/loader/{game_version}/{loader_version}/profile/json",
+            _cache_path(self.name, game_version, f"{loader_version}.json")
+        )
+        return {"profile": profile, "artifacts": library_artifacts(profile)}
+
+    def finish(self, plan, game_version, cancel_event=None):
+        pass
+
+
+# Forge 需要下载安装程序，从中取出版本 JSON 和安装配置；新版本还要在库下载完成后运行安装配置中的处理器
+class ForgeLoader:
+    name = "forge"
+
+    def _all_versions(self):
+        return _fetch_json(f"{FORGE_FILES_URL}/maven-metadata.json", _cache_path("forge", "maven-metadata.json"),
+                           VERSIONS_TTL)
+
+    def versions(self, game_version):
+        return list(reversed(self._all_versions().get(game_version, [])))
+
+    def default_version(self, game_version):
+        promotions = _fetch_json(f"{FORGE_FILES_URL}/promotions_slim.json",
+                                 _cache_path("forge", "promotions_slim.json"), VERSIONS_TTL)
+        promos = promotions.get("promos", {})
+        promoted = promos.get(f"{game_version}-recommended") or promos.get(f"{game_version}-latest")
+        if promoted:
+            return promoted
+        versions = self.versions(game_version)
+        if not versions:
+            raise LoaderError(f"Forge does not support Minecraft {game_version}.")
+        return versions[0]
+
+    # 完整版本号形如 1.20.1-47.2.0，部分旧版本还带有额外后缀，以 Maven 元数据为准
+    def _full_version(self, game_version, loader_version):
+        for full_version in self._all_versions().get(game_version, []):
+            if full_version in (loader_version, f"{game_version}-{loader_version}"):
+                return full_version
+        return f"{game_version}-{loader_version}"
+
+    def _installer(self, full_version):
+        path = _cache_path("forge", f"forge-{full_version}-installer.jar")
+        if not os.path.isfile(path):
+            url = f"{FORGE_MAVEN_URL}/{full_version}/forge-{full_version}-installer.jar"
+            try:
+                download_file(get_client(), {"url": url, "path": path, "sha1": None, "size": None})
+            except (requests.RequestException, IOError) as e:
+                raise LoaderError(f"Failed to download the Forge installer: {e}")
+        return path
+
+    def prepare(self, game_version, loader_version):
+        installer = self._installer(self._full_version(game_version, loader_version))
+        try:
+            with zipfile.ZipFile(installer) as jar:
+                install_profile = json.loads(jar.read("install_profile.json"))
+                if "versionInfo" in install_profile:
+                    return self._prepare_legacy(jar, install_profile)
+                profile = json.loads(jar.read(install_profile.get("json", "/version.json").lstrip("/")))
+                # 处理器依赖的库只在安装时使用，同样放进库目录
+                libraries = profile.get("libraries", []) + install_profile.get("libraries", [])
+                self._extract_bundled(jar, libraries)
+        except (KeyError, zipfile.BadZipFile, json.JSONDecodeError) as e:
+            raise LoaderError(f"Invalid Forge installer {installer}: {e}")
+        artifacts = library_artifacts({"libraries": libraries})
+        return {"profile": profile, "artifacts": artifacts, "installer": installer, "install_profile": install_profile}
+
+    # 旧版安装程序（1.12.2 及以前）：版本 JSON 内嵌在安装配置中，Forge 本体直接打包在安装程序里
+    def _prepare_legacy(self, jar, install_profile):
+        install = install_profile["install"]
+        target = os.path.join(libraries_dir(), maven_path(install["path"]))
+        if not os.path.isfile(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target + ".tmp", "wb") as f:
+                f.write(jar.read(install["filePath"]))
+            os.replace(target + ".tmp", target)
+        profile = install_profile["versionInfo"]
+        libraries = [library for library in profile.get("libraries", []) if library["name"] != install["path"]]
+        return {"profile": profile, "artifacts": library_artifacts({"libraries": libraries})}
+
+    # 没有下载地址的库打包在安装程序的 maven/ 目录中
+    def _extract_bundled(self, jar, libraries):
+        names = set(jar.namelist())
+        for library in libraries:
+            artifact = library.get("downloads", {}).get("artifact")
+            if not artifact or artifact.get("url") or f"maven/{artifact['path']}" not in names:
+                continue
+            target = os.path.join(libraries_dir(), artifact["path"])
+            if is_up_to_date({"path": target, "sha1": artifact.get("sha1"), "size": artifact.get("size")}):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target + ".tmp", "wb") as f:
+                f.write(jar.read(f"maven/{artifact['path']}"))
+            os.replace(target + ".tmp", target)
+
+    def _data(self, plan, game_version, work_dir):
+        data = {}
+        with zipfile.ZipFile(plan["installer"]) as jar:
+            for key, value in plan["install_profile"].get("data", {}).items():
+                value = value["client"]
+                if value.startswith("/"):
+                    target = os.path.join(work_dir, value.lstrip("/"))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as f:
+                        f.write(jar.read(value.lstrip("/")))
+                    data[key] = target
+                else:
+                    data[key] = self._argument(value, data)
+        data.update({
+            "SIDE": "client",
+            "MINECRAFT_JAR": os.path.abspath(os.path.join(version_dir(game_version), f"{game_version}.jar")),
+            "MINECRAFT_VERSION": game_version,
+            "ROOT": os.path.abspath(MINECRAFT_DIR),
+            "INSTALLER": os.path.abspath(plan["installer"]),
+            "LIBRARY_DIR": os.path.abspath(libraries_dir())
+        })
+        return data
+
+    # 处理器参数：{KEY} 取安装数据，[坐标] 为库文件路径，'文本' 为字面量
+    def _argument(self, value, data):
+        if value.startswith("{") and value.endswith("}"):
+            return data[value[1:-1]]
+        if value.startswith("[") and value.endswith("]"):
+            return os.path.abspath(os.path.join(libraries_dir(), maven_path(value[1:-1])))
+        if value.startswith("'") and value.endswith("'"):
+            return value[1:-1]
+        return value
+
+    def _outputs_match(self, outputs):
+        return bool(outputs) and all(
+            os.path.isfile(path) and file_sha1(path) == sha1 for path, sha1 in outputs.items()
+        )
+
+    def finish(self, plan, game_version, cancel_event=None):
+        processors = plan.get("install_profile", {}).get("processors", [])
+        if not processors:
+            return
+        work_dir = _cache_path("forge", "work", game_version)
+        try:
+            data = self._data(plan, game_version, work_dir)
+            for processor in processors:
+                self._process(processor, data, cancel_event)
+        except KeyError as e:
+            raise LoaderError(f"Forge installer refers to unknown data {e}")
+
+    def _process(self, processor, data, cancel_event):
+        if "client" not in processor.get("sides", ["client"]):
+            return
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoaderError("Installation cancelled.")
+        outputs = {
+            self._argument(path, data): self._argument(sha1, data)
+            for path, sha1 in processor.get("outputs", {}).items()
+        }
+        # 输出已存在且哈希一致时跳过，重新安装同一个 Forge 版本不再重复处理
+        if self._outputs_match(outputs):
+            return
+        self._run_processor(processor, data)
+        if outputs and not self._outputs_match(outputs):
+            raise LoaderError(f"Forge processor {processor['jar']} produced unexpected output.")
+
+    def _run_processor(self, processor, data):
+        jar_path = self._argument(f"[{processor['jar']}]", data)
+        try:
+            with zipfile.ZipFile(jar_path) as jar:
+                manifest = jar.read("META-INF/MANIFEST.MF").decode("utf-8")
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            raise LoaderError(f"Invalid Forge processor {processor['jar']}: {e}")
+        main_class = next(
+            (line.split(":", 1)[1].strip() for line in manifest.splitlines() if line.startswith("Main-Class:")), None
+        )
+        if main_class is None:
+            raise LoaderError(f"Forge processor {processor['jar']} has no main class.")
+        classpath = [jar_path] + [self._argument(f"[{name}]", data) for name in processor.get("classpath", [])]
+        command = ["java", "-cp", os.pathsep.join(classpath), main_class]
+        command.extend(self._argument(argument, data) for argument in processor.get("args", []))
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except OSError as e:
+            raise LoaderError(f"Failed to run Java for the Forge installer: {e}")
+        if result.returncode != 0:
+            output = (result.stdout + result.stderr).strip().splitlines()[-10:]
+            raise LoaderError(f"Forge processor {processor['jar']} failed:\n" + "\n".join(output))
+
+
+_loaders = {
+    "forge": ForgeLoader(),
+    "fabric": MetaLoader("fabric", FABRIC_META_URL),
+    "quilt": MetaLoader("quilt", QUILT_META_URL)
+}
+
+
+def get_loader(name):
+    try:
+        return _loaders[name]
+    except KeyError:
+        raise LoaderError(f"Unknown mod loader: {name}")
+
+
+# 加载器版本的 id，例如 1.20.1-fabric-0.15.11；Forge 的版本号可能已带有游戏版本前缀
+def loader_version_id(name, game_version, loader_version):
+    return f"{game_version}-{name}-{loader_version.removeprefix(game_version + '-')}"
+
+
+# 解析加载器版本并读取其配置；返回安装计划，其中 id 是加载器版本的 id，artifacts 是需要与原版文件一起下载的库
+def prepare_loader(name, game_version, loader_version=None):
+    loader = get_loader(name)
+    loader_version = loader_version or loader.default_version(game_version)
+    plan = loader.prepare(game_version, loader_version)
+    plan.update(loader=name, version=loader_version)
+    # 安装程序的库列表与加载器版本 JSON 常有重复
+    artifacts = {}
+    for artifact in plan["artifacts"]:
+        artifacts.setdefault(artifact["path"], artifact)
+    plan["artifacts"] = list(artifacts.values())
+    plan["id"] = loader_version_id(name, game_version, loader_version)
+    plan["profile"].update(id=plan["id"], inheritsFrom=game_version)
+    return plan
+
+
+# 库下载完成后执行加载器的安装步骤，再写入加载器版本 JSON，启动时与原版 JSON 合并
+def finish_loader(plan, game_version, cancel_event=None):
+    get_loader(plan["loader"]).finish(plan, game_version, cancel_event)
+    _write_json(version_json_path(plan["id"]), plan["profile"])
@@ -1,134 +1,52 @@
 import sys
 import os
-import json
-import requests
-import subprocess
+from core import (
+    get_minecraft_versions, install_minecraft_version, launch_minecraft, repair_minecraft_version,
+    upgrade_minecraft_version, finish_minecraft_version, has_pending_downloads
+)
+from jobs import Job, JobManager
+from supervisor import supervisor, LOG_BUFFER_LINES
+from jvm_tuning import GC_PRESETS, DEFAULT_GC_PRESET, java_major_version
+from version_browser import VersionListModel, VERSION_TYPES
+from i18n import load_catalog
+from metrics import metrics
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, QComboBox, QListWidget, QMessageBox, QDialog, QLineEdit, QGridLayout, QRadioButton, QButtonGroup, QAction, QToolBar, QToolButton, QListWidgetItem
+    QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, QComboBox, QListWidget, QMessageBox, QDialog, QLineEdit, QGridLayout, QRadioButton, QButtonGroup, QAction, QToolBar, QToolButton, QListWidgetItem,
+    QAbstractItemView, QProgressBar, QPlainTextEdit, QCheckBox, QMenu, QInputDialog, QListView, QTableWidget,
+    QTableWidgetItem, QHeaderView, QFileDialog
 )
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QImageReader
+from PyQt5.QtCore import Qt, QTimer, QRect
 
-# 加载语言文件
+# 加载语言文件（已加载过的语言直接从内存返回，缺少的键回退到英文）
 def load_language(lang_code):
-    try:
-        with open(f"languages/{lang_code}.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Language file 'languages/{lang_code}.json' not found. Using default language.")
-        return load_language("english")
-
-# 加载已安装版本和账户
-def load_installed_data():
-    try:
-        with open("versions.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"versions": [], "accounts": []}
-
-# 保存已安装版本和账户
-def save_installed_data(data):
-    with open("versions.json", "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-
-# 获取 Minecraft 版本列表
-def get_minecraft_versions():
-    url = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        versions = [entry["id"] for entry in data["versions"]]
-        return versions
-    else:
-        QMessageBox.critical(None, "Error", "Failed to fetch Minecraft versions.")
-        return []
-
-# 下载 Minecraft 版本
-def download_minecraft_version(version):
-    url = f"https://launchermeta.mojang.com/mc/game/version_manifest.json"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        for entry in data["versions"]:
-            if entry["id"] == version:
-                client_url = entry["url"]
-                break
-        else:
-            QMessageBox.critical(None, "Error", f"Version {version} not found.")
-            return None
-
-        response = requests.get(client_url)
-        if response.status_code == 200:
-            return response.json()["downloads"]["client"]["url"]
-        else:
-            QMessageBox.critical(None, "Error", "Failed to fetch version details.")
-            return None
-    else:
-        QMessageBox.critical(None, "Error", "Failed to fetch version manifest.")
-        return None
-
-# 下载并安装 Minecraft 版本
-def install_minecraft_version(version, install_type, display_name):
-    client_url = download_minecraft_version(version)
-    if not client_url:
-        return False
-
-    response = requests.get(client_url, stream=True)
-    if response.status_code == 200:
-        version_dir = os.path.join(".minecraft", "versions", version)
-        os.makedirs(version_dir, exist_ok=True)
-
-        with open(os.path.join(version_dir, f"{version}.jar"), "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                f.write(chunk)
-
-        # 创建版本配置文件
-        version_config = {
-            "name": version,
-            "type": install_type,
-            "displayName": display_name
-        }
-        with open(os.path.join(version_dir, "version.json"), "w", encoding="utf-8") as f:
-            json.dump(version_config, f, indent=4)
-
-        QMessageBox.information(None, "Success", f"Installed {display_name} ({install_type}) successfully.")
-        return True
-    else:
-        QMessageBox.critical(None, "Error", "Failed to download Minecraft version.")
-        return False
-
-# 启动 Minecraft
-def launch_minecraft(version, install_type, account_name):
-    try:
-        version_dir = os.path.join(".minecraft", "versions", version)
-        if not os.path.exists(version_dir):
-            QMessageBox.critical(None, "Error", f"Version {version} not found.")
-            return
+    return load_catalog(lang_code)
 
-        # 启动命令
-        command = [
-            "java", "-Xmx2G", "-Xms2G", "-jar", os.path.join(version_dir, f"{version}.jar"), "nogui",
-            "--username", account_name
-        ]
-        subprocess.run(command)
-        QMessageBox.information(None, "Success", f"Minecraft {version} has been launched!")
-    except Exception as e:
-        QMessageBox.critical(None, "Error", f"Failed to launch Minecraft: {e}")
+# 只解码窗口可见区域内的背景图片（QImage 可以在后台线程中使用，QPixmap 不行）
+def load_background_image(path, clip_rect):
+    reader = QImageReader(path)
+    reader.setClipRect(clip_rect.intersected(QRect(0, 0, reader.size().width(), reader.size().height())))
+    return reader.read()
 
 # 主窗口类
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.language = load_language("english")  # 默认语言为英文
-        self.data = load_installed_data()
+        self._store = None
+        self._painted = False
+        self.jobs = JobManager(parent=self)
+        self.jobs_window = None
+        # 版本名 -> 补齐声音和音乐的后台任务
+        self.background_jobs = {}
+        self.instances_window = None
+        self.stats_window = None
         self.setWindowTitle(self.language["welcome_message"])
         self.resize(800, 600)  # 设置初始窗口大小
 
-        # 设置背景图片
-        bg_label = QLabel(self)
-        pixmap = QPixmap("images/bg.png")
-        bg_label.setPixmap(pixmap)
-        bg_label.setGeometry(0, 0, 800, 600)
+        # 背景图片在窗口首次绘制之后再加载
+        self.bg_label = QLabel(self)
+        self.bg_label.setGeometry(0, 0, 800, 600)
 
         # 顶部欢迎文字
         self.welcome_label = QLabel(self.language["welcome_message"], self)
@@ -164,15 +82,52 @@ class MainWindow(QMainWindow):
         self.manage_versions_button.triggered.connect(self.open_version_manager)
         self.toolbar.addAction(self.manage_versions_button)
 
+        # 运行中的实例按钮
+        self.instances_button = QAction(self.language["instances"], self)
+        self.instances_button.triggered.connect(self.open_instances_window)
+        self.toolbar.addAction(self.instances_button)
+
+        # 统计面板按钮
+        self.stats_button = QAction(self.language["stats"], self)
+        self.stats_button.triggered.connect(self.open_stats_window)
+        self.toolbar.addAction(self.stats_button)
+
         # 语言选择
         self.language_combo = QComboBox()
         self.language_combo.addItems(["English", "Chinese"])
         self.language_combo.currentTextChanged.connect(self.change_language)
         self.toolbar.addWidget(self.language_combo)
 
-        # 检查是否有已安装版本
-        if not self.data["versions"]:
-            self.launch_button.setEnabled(False)
+    # 已安装数据在第一次使用时才打开
+    @property
+    def store(self):
+        if self._store is None:
+            from data_store import InstalledDataStore
+            self._store = InstalledDataStore()
+        return self._store
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            if os.environ.get("PYL_STARTUP_BENCHMARK"):
+                print("first_paint", flush=True)
+                QTimer.singleShot(0, QApplication.quit)
+                return
+            QTimer.singleShot(0, self.load_deferred)
+
+    # 窗口显示之后再做的初始化：背景图片在后台线程解码，然后检查已安装版本
+    def load_deferred(self):
+        job = Job("Load background", lambda job: load_background_image("images/bg.png", QRect(0, 0, 800, 600)))
+        job.signals.finished.connect(lambda image: self.bg_label.setPixmap(QPixmap.fromImage(image)))
+        self.jobs.run_in_background(job)
+        # 提前检测 Java 版本（结果会缓存），第一次启动时不再等待 java -version
+        self.jobs.run_in_background(Job("Detect Java", lambda job: java_major_version()))
+        self.launch_button.setEnabled(self.store.has_versions())
+        # 继续上次没有补齐的下载
+        for version in self.store.list_versions():
+            if has_pending_downloads(version["name"]):
+                self.queue_background_downloads(version["name"])
 
     def change_language(self, lang):
         if lang == "English":
@@ -189,12 +144,14 @@ class MainWindow(QMainWindow):
         self.create_account_button.setText(self.language["create_account"])
         self.manage_accounts_button.setText(self.language["manage_accounts"])
         self.manage_versions_button.setText(self.language["manage_versions"])
+        self.instances_button.setText(self.language["instances"])
+        self.stats_button.setText(self.language["stats"])
 
     def open_download_window(self):
         DownloadWindow(self).exec_()
 
     def open_version_selector(self):
-        if not self.data["versions"]:
+        if not self.store.has_versions():
             QMessageBox.information(self, "Info", self.language["no_versions_installed"])
             return
         VersionSelector(self).exec_()
@@ -208,28 +165,162 @@ class MainWindow(QMainWindow):
     def open_version_manager(self):
         VersionManager(self).exec_()
 
+    def open_jobs_window(self):
+        if self.jobs_window is None:
+            self.jobs_window = JobsWindow(self)
+        self.jobs_window.show()
+        self.jobs_window.raise_()
+
+    def open_instances_window(self):
+        if self.instances_window is None:
+            self.instances_window = InstancesWindow(self)
+        self.instances_window.show()
+        self.instances_window.raise_()
+
+    def open_stats_window(self):
+        if self.stats_window is None:
+            self.stats_window = StatsWindow(self)
+        self.stats_window.show()
+        self.stats_window.raise_()
+
+    # 把安装加入后台队列，必需文件下载完成后写入已安装版本并允许启动，声音和音乐随后在后台补齐
+    # 模组加载器安装到自己的版本 id，以安装结果中的版本名记录；取消的新安装由安装流程自行清理
+    def queue_install(self, version, install_type, display_name):
+        job = Job(f"{display_name} ({install_type})", lambda job: install_minecraft_version(
+            version, install_type, display_name, progress=job.report, cancel_event=job.cancel_event,
+            defer_background=True
+        ))
+        job.signals.finished.connect(lambda version_config: self.on_version_installed(
+            version_config["name"], display_name, install_type
+        ))
+        job.signals.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.jobs.submit(job)
+
+    def on_version_installed(self, version, display_name, install_type):
+        # 保存已安装版本；重新安装同一版本时保留原有记录
+        if not self.store.has_version(version):
+            self.store.add_version(version, display_name, install_type)
+        self.launch_button.setEnabled(True)
+        self.queue_background_downloads(version)
+        QMessageBox.information(self, "Success", f"Installed {display_name} ({install_type}) successfully. "
+                                                 "Sounds and music are downloading in the background.")
+
+    # 在单独的线程池中补齐声音和音乐；取消后下次启动启动器时继续
+    def queue_background_downloads(self, version):
+        job = Job(f"{version} sounds and music", lambda job: finish_minecraft_version(
+            version, progress=job.report, cancel_event=job.cancel_event
+        ))
+        job.signals.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.background_jobs[version] = job
+        self.jobs.submit(job, background_download=True)
+
+    # 启动准备（编译启动配置、解压 natives、检测 Java）在后台线程中执行，不卡住界面
+    def queue_launch(self, version, install_type, account_name, gc_preset, use_appcds):
+        job = Job(f"Launch {version}", lambda job: launch_minecraft(
+            version, install_type, account_name, gc_preset, use_appcds
+        ))
+        job.signals.finished.connect(lambda instance: self.on_launched(version, gc_preset, use_appcds))
+        job.signals.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.jobs.run_in_background(job)
+
+    # 启动成功后记住这个版本的 JVM 设置
+    def on_launched(self, version, gc_preset, use_appcds):
+        metadata = self.store.get_instance(version) or {}
+        metadata.update(gcPreset=gc_preset, appcds=use_appcds)
+        self.store.set_instance(version, metadata)
+        self.open_instances_window()
+        QMessageBox.information(self, "Success", f"Minecraft {version} has been launched!")
+
+    # 校验版本文件并重新下载缺失或损坏的文件
+    def queue_repair(self, version):
+        job = Job(f"Repair {version}", lambda job: repair_minecraft_version(
+            version, progress=job.report, cancel_event=job.cancel_event
+        ))
+        job.signals.finished.connect(lambda repaired: QMessageBox.information(
+            self, "Success", f"Repaired {len(repaired)} file(s) of {version}." if repaired else f"All files of {version} are intact."
+        ))
+        job.signals.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.jobs.submit(job)
+
+    # 升级版本：只下载新增或变化的文件，完成后在同一个事务中切换版本记录
+    # 升级完成后旧版本会被删除，同样要先停下旧版本的后台下载；升级失败时旧版本继续补齐
+    def queue_upgrade(self, old_version, new_version):
+        job = Job(f"Upgrade {old_version} to {new_version}", lambda job: upgrade_minecraft_version(
+            old_version, new_version, lambda config: self.store.replace_version(old_version, config["name"]),
+            progress=job.report, cancel_event=job.cancel_event
+        ))
+        job.signals.finished.connect(lambda summary: QMessageBox.information(
+            self, "Success", f"Upgraded {old_version} to {new_version}: downloaded "
+            f"{summary['downloaded_bytes'] / (1024 * 1024):.1f} MiB, reused {summary['reused_files']} file(s)."
+        ))
+        job.signals.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        job.signals.failed.connect(lambda message: self.resume_background_downloads(old_version))
+        job.signals.cancelled.connect(lambda: self.resume_background_downloads(old_version))
+        self.after_background_downloads(old_version, lambda: self.jobs.submit(job))
+
+    def resume_background_downloads(self, version):
+        if has_pending_downloads(version):
+            self.queue_background_downloads(version)
+
+    def queue_delete(self, version):
+        from installer import remove_version_files
+        self.after_background_downloads(version, lambda: self.jobs.submit(
+            Job(f"Delete {version}", lambda job: remove_version_files(version))
+        ))
+
+    # 后台下载结束时会登记已下载的文件，删除或替换版本前先取消它，等它停下来再执行 action
+    def after_background_downloads(self, version, action):
+        background = self.background_jobs.pop(version, None)
+        if background is None or background.state in ("finished", "failed", "cancelled"):
+            action()
+            return
+        background.cancel()
+        for signal in (background.signals.finished, background.signals.failed, background.signals.cancelled):
+            signal.connect(lambda *args: action())
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        if self._store is not None:
+            self._store.close()
+        super().closeEvent(event)
+
 # 下载版本窗口
 class DownloadWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle(self.parent().language["download_version"])
-        self.setFixedSize(400, 400)
+        self.setFixedSize(400, 450)
 
         layout = QGridLayout()
 
-        # 获取版本列表
-        self.versions = get_minecraft_versions()
-
-        # 版本列表
-        self.list_widget = QListWidget()
-        self.list_widget.addItems(self.versions)
-        layout.addWidget(self.list_widget, 0, 0, 1, 2)
+        # 搜索框和筛选条件
+        self.search_input = QLineEdit(self)
+        self.search_input.setPlaceholderText("Search...")
+        self.search_input.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.search_input, 0, 0, 1, 2)
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(["all"] + VERSION_TYPES)
+        self.type_combo.setCurrentText("release")
+        self.type_combo.currentTextChanged.connect(self.apply_filter)
+        layout.addWidget(self.type_combo, 1, 0)
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(["Newest first", "Oldest first"])
+        self.sort_combo.currentTextChanged.connect(self.apply_filter)
+        layout.addWidget(self.sort_combo, 1, 1)
+
+        # 版本列表，只渲染可见的行；可一次选择多个版本排队安装
+        self.version_model = VersionListModel(self)
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_view.setModel(self.version_model)
+        layout.addWidget(self.list_view, 2, 0, 1, 2)
 
         # 重命名版本
         self.rename_label = QLabel(self.parent().language["rename_version"])
         self.rename_input = QLineEdit(self)
-        layout.addWidget(self.rename_label, 1, 0)
-        layout.addWidget(self.rename_input, 1, 1)
+        layout.addWidget(self.rename_label, 3, 0)
+        layout.addWidget(self.rename_input, 3, 1)
 
         # 安装类型单选按钮
         self.button_group = QButtonGroup(self)
@@ -237,25 +328,48 @@ class DownloadWindow(QDialog):
         self.forge_radio = QRadioButton(self.parent().language["forge"])
         self.fabric_radio = QRadioButton(self.parent().language["fabric"])
         self.quilt_radio = QRadioButton(self.parent().language["quilt"])
+        self.original_radio.setChecked(True)
         self.button_group.addButton(self.original_radio)
         self.button_group.addButton(self.forge_radio)
         self.button_group.addButton(self.fabric_radio)
         self.button_group.addButton(self.quilt_radio)
-        layout.addWidget(self.original_radio, 2, 0)
-        layout.addWidget(self.forge_radio, 2, 1)
-        layout.addWidget(self.fabric_radio, 3, 0)
-        layout.addWidget(self.quilt_radio, 3, 1)
+        layout.addWidget(self.original_radio, 4, 0)
+        layout.addWidget(self.forge_radio, 4, 1)
+        layout.addWidget(self.fabric_radio, 5, 0)
+        layout.addWidget(self.quilt_radio, 5, 1)
 
         # 安装按钮
-        install_button = QPushButton(self.parent().language["install"])
-        install_button.clicked.connect(self.install_version)
-        layout.addWidget(install_button, 4, 0, 1, 2)
+        self.install_button = QPushButton(self.parent().language["install"])
+        self.install_button.setEnabled(False)
+        self.install_button.clicked.connect(self.install_version)
+        layout.addWidget(self.install_button, 6, 0, 1, 2)
 
         self.setLayout(layout)
 
+        # 在后台获取版本列表，窗口先显示出来
+        job = Job("Fetch versions", lambda job: get_minecraft_versions())
+        job.signals.finished.connect(self.set_versions)
+        job.signals.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.parent().jobs.run_in_background(job)
+
+    def set_versions(self, versions):
+        self.version_model.set_entries(versions)
+        self.apply_filter()
+        self.install_button.setEnabled(True)
+
+    def apply_filter(self):
+        version_type = self.type_combo.currentText()
+        self.version_model.set_filter(
+            () if version_type == "all" else (version_type,),
+            self.search_input.text(),
+            self.sort_combo.currentText() == "Newest first"
+        )
+
     def install_version(self):
-        selected_version = self.list_widget.currentItem().text()
-        display_name = self.rename_input.text() or selected_version
+        selected_versions = [index.data(Qt.UserRole) for index in self.list_view.selectionModel().selectedIndexes()]
+        if not selected_versions:
+            QMessageBox.information(self, "Info", "Please select a version to install.")
+            return
         install_type = ""
         if self.original_radio.isChecked():
             install_type = "original"
@@ -266,13 +380,13 @@ class DownloadWindow(QDialog):
         elif self.quilt_radio.isChecked():
             install_type = "quilt"
 
-        # 安装 Minecraft 版本
-        if install_minecraft_version(selected_version, install_type, display_name):
-            # 保存已安装版本
-            self.parent().data["versions"].append({"name": selected_version, "display_name": display_name, "type": install_type})
-            save_installed_data(self.parent().data)
-            self.parent().launch_button.setEnabled(True)
-            QMessageBox.information(self, "Success", f"Installed {display_name} ({install_type}) successfully.")
+        # 安装 Minecraft 版本；只选择一个版本时才使用重命名
+        for selected_version in selected_versions:
+            display_name = selected_version
+            if len(selected_versions) == 1 and self.rename_input.text():
+                display_name = self.rename_input.text()
+            self.parent().queue_install(selected_version, install_type, display_name)
+        self.parent().open_jobs_window()
         self.close()
 
 # 版本选择窗口
@@ -284,14 +398,24 @@ class VersionSelector(QDialog):
 
         layout = QVBoxLayout()
 
-        # 已安装版本列表
+        # 已安装版本列表；选中版本时恢复它上次启动时的 JVM 设置
         self.list_widget = QListWidget()
-        for version in self.parent().data["versions"]:
+        for version in self.parent().store.list_versions():
             item = QListWidgetItem(f"{version['display_name']} [{version['type']}]")
             item.setData(Qt.UserRole, version)
             self.list_widget.addItem(item)
+        self.list_widget.currentItemChanged.connect(self.load_instance_settings)
         layout.addWidget(self.list_widget)
 
+        # JVM 调优选项
+        self.gc_combo = QComboBox()
+        self.gc_combo.addItems(GC_PRESETS.keys())
+        self.gc_combo.setCurrentText(DEFAULT_GC_PRESET)
+        layout.addWidget(self.gc_combo)
+        self.appcds_checkbox = QCheckBox("AppCDS")
+        self.appcds_checkbox.setChecked(True)
+        layout.addWidget(self.appcds_checkbox)
+
         # 启动按钮
         launch_button = QPushButton(self.parent().language["launch_mc"])
         launch_button.clicked.connect(self.launch_mc)
@@ -309,6 +433,13 @@ class VersionSelector(QDialog):
 
         self.setLayout(layout)
 
+    def load_instance_settings(self, item):
+        if item is None:
+            return
+        metadata = self.parent().store.get_instance(item.data(Qt.UserRole)["name"]) or {}
+        self.gc_combo.setCurrentText(metadata.get("gcPreset", DEFAULT_GC_PRESET))
+        self.appcds_checkbox.setChecked(metadata.get("appcds", True))
+
     def launch_mc(self):
         selected_item = self.list_widget.currentItem()
         if not selected_item:
@@ -320,10 +451,12 @@ class VersionSelector(QDialog):
         install_type = version_data["type"]
 
         # 获取账户名称
-        account_name = self.parent().data["accounts"][0]["name"] if self.parent().data["accounts"] else "offline_user"
+        account = self.parent().store.first_account()
+        account_name = account["name"] if account else "offline_user"
 
         # 启动 Minecraft
-        launch_minecraft(selected_version, install_type, account_name)
+        self.parent().queue_launch(selected_version, install_type, account_name,
+                                   self.gc_combo.currentText(), self.appcds_checkbox.isChecked())
 
     def open_folder(self):
         selected_item = self.list_widget.currentItem()
@@ -348,11 +481,241 @@ class VersionSelector(QDialog):
         if confirm == QMessageBox.Yes:
             version_data = selected_item.data(Qt.UserRole)
             selected_version = version_data["name"]
-            self.parent().data["versions"] = [v for v in self.parent().data["versions"] if v["name"] != selected_version]
-            save_installed_data(self.parent().data)
+            self.parent().store.remove_version(selected_version)
+            self.parent().queue_delete(selected_version)
             self.list_widget.takeItem(self.list_widget.row(selected_item))
             QMessageBox.information(self, "Success", "Version deleted successfully.")
 
+# 后台任务列表中的一行：标题、进度条、速度和剩余时间、取消按钮
+class JobRow(QWidget):
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.title_label = QLabel(job.title)
+        self.status_label = QLabel("Queued")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(job.cancel)
+        layout.addWidget(self.title_label, 0, 0)
+        layout.addWidget(self.status_label, 0, 1)
+        layout.addWidget(self.progress_bar, 1, 0)
+        layout.addWidget(self.cancel_button, 1, 1)
+        self.setLayout(layout)
+
+        job.signals.started.connect(lambda: self.status_label.setText("Running"))
+        job.signals.progress.connect(self.update_progress)
+        job.signals.finished.connect(lambda result: self.set_done("Done"))
+        job.signals.failed.connect(lambda message: self.set_done("Failed"))
+        job.signals.cancelled.connect(lambda: self.set_done("Cancelled"))
+
+    def update_progress(self, done, total, speed, eta):
+        if total:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(done * 1000 / total))
+        status = f"{speed / 1024 / 1024:.1f} MB/s"
+        if eta >= 0:
+            status += f", {int(eta) // 60}:{int(eta) % 60:02d} left"
+        self.status_label.setText(status)
+
+    def set_done(self, status):
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1)
+        self.status_label.setText(status)
+        self.cancel_button.setEnabled(False)
+
+# 后台任务窗口（非模态），可同时查看多个排队中的安装
+class JobsWindow(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Downloads")
+        self.resize(500, 300)
+
+        self.rows_layout = QVBoxLayout()
+        self.rows_layout.addStretch()
+        layout = QVBoxLayout()
+        layout.addLayout(self.rows_layout)
+
+        # 取消全部按钮
+        cancel_all_button = QPushButton("Cancel all")
+        cancel_all_button.clicked.connect(self.parent().jobs.cancel_all)
+        layout.addWidget(cancel_all_button)
+        self.setLayout(layout)
+
+        for job in self.parent().jobs.jobs:
+            self.add_job(job)
+        self.parent().jobs.job_added.connect(self.add_job)
+
+    def add_job(self, job):
+        self.rows_layout.insertWidget(self.rows_layout.count() - 1, JobRow(job))
+
+# 运行中的实例窗口（非模态）：状态、启动耗时、退出码
+class InstancesWindow(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Instances")
+        self.resize(500, 300)
+        self.log_windows = {}
+
+        layout = QVBoxLayout()
+        self.list_widget = QListWidget()
+        self.list_widget.itemDoubleClicked.connect(self.show_log)
+        layout.addWidget(self.list_widget)
+
+        # 查看日志按钮
+        log_button = QPushButton("Show log")
+        log_button.clicked.connect(self.show_log)
+        layout.addWidget(log_button)
+
+        # 结束实例按钮
+        stop_button = QPushButton("Stop")
+        stop_button.clicked.connect(self.stop_instance)
+        layout.addWidget(stop_button)
+
+        # 清除已退出实例按钮
+        clear_button = QPushButton("Clear exited")
+        clear_button.clicked.connect(self.clear_exited)
+        layout.addWidget(clear_button)
+
+        self.setLayout(layout)
+
+        # 定时刷新实例状态，进程退出由读取线程记录，界面只负责展示
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def describe(self, instance):
+        if instance.is_running():
+            status = f"running (pid {instance.process.pid})"
+        else:
+            status = f"exited with code {instance.exit_code}"
+        startup_time = instance.startup_time()
+        if startup_time is not None:
+            status += f", started in {startup_time:.1f}s"
+        return f"#{instance.id} {instance.name} - {status}"
+
+    def refresh(self):
+        instances = list(supervisor.instances.values())
+        while self.list_widget.count() > len(instances):
+            self.list_widget.takeItem(self.list_widget.count() - 1)
+        for row, instance in enumerate(instances):
+            item = self.list_widget.item(row)
+            if item is None:
+                item = QListWidgetItem()
+                self.list_widget.addItem(item)
+            item.setText(self.describe(instance))
+            item.setData(Qt.UserRole, instance.id)
+
+    def selected_instance(self):
+        selected_item = self.list_widget.currentItem()
+        if not selected_item:
+            QMessageBox.information(self, "Info", "Please select an instance.")
+            return None
+        return supervisor.instances.get(selected_item.data(Qt.UserRole))
+
+    def show_log(self):
+        instance = self.selected_instance()
+        if instance is None:
+            return
+        if instance.id not in self.log_windows:
+            self.log_windows[instance.id] = LogWindow(instance, self)
+        self.log_windows[instance.id].show()
+        self.log_windows[instance.id].raise_()
+
+    def stop_instance(self):
+        instance = self.selected_instance()
+        if instance is not None:
+            instance.stop()
+
+    def clear_exited(self):
+        supervisor.prune()
+        for instance_id in [i for i in self.log_windows if i not in supervisor.instances]:
+            self.log_windows.pop(instance_id).close()
+        self.refresh()
+
+# 实例日志窗口：增量读取实例的环形日志缓冲区
+class LogWindow(QDialog):
+    def __init__(self, instance, parent=None):
+        super().__init__(parent)
+        self.instance = instance
+        self.setWindowTitle(f"Log - {instance.name}")
+        self.resize(700, 450)
+        self.line_count = 0
+
+        layout = QVBoxLayout()
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setMaximumBlockCount(LOG_BUFFER_LINES)
+        layout.addWidget(self.text_edit)
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(300)
+        self.refresh()
+
+    def refresh(self):
+        lines, self.line_count = self.instance.read_lines(self.line_count)
+        if lines:
+            self.text_edit.appendPlainText("\n".join(lines))
+
+# 统计面板：实时显示网络、下载、安装和启动的各项指标，可导出
+class StatsWindow(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Stats")
+        self.resize(650, 450)
+
+        layout = QVBoxLayout()
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Metric", "Labels", "Value"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        # 导出按钮
+        jsonl_button = QPushButton("Export recent spans (JSON lines)")
+        jsonl_button.clicked.connect(self.export_jsonl)
+        layout.addWidget(jsonl_button)
+        prometheus_button = QPushButton("Export metrics (Prometheus)")
+        prometheus_button.clicked.connect(self.export_prometheus)
+        layout.addWidget(prometheus_button)
+
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        rows = metrics.snapshot()
+        self.table.setRowCount(len(rows))
+        for row, (name, labels, value) in enumerate(rows):
+            text = f"{value:.3f}" if isinstance(value, float) else str(value)
+            for column, cell in enumerate((name, ", ".join(f"{k}={v}" for k, v in labels.items()), text)):
+                item = self.table.item(row, column)
+                if item is None:
+                    self.table.setItem(row, column, QTableWidgetItem(cell))
+                elif item.text() != cell:
+                    item.setText(cell)
+
+    def export_jsonl(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export spans", "pyl-spans.jsonl", "JSON lines (*.jsonl)")
+        if path:
+            metrics.write_jsonl(path)
+
+    def export_prometheus(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export metrics", "pyl-metrics.prom", "Prometheus text (*.prom)")
+        if path:
+            metrics.write_prometheus(path)
+
 # 离线账户创建窗口
 class AccountCreator(QDialog):
     def __init__(self, parent=None):
@@ -382,8 +745,7 @@ class AccountCreator(QDialog):
             return
 
         # 保存账户
-        self.parent().data["accounts"].append({"name": account_name})
-        save_installed_data(self.parent().data)
+        self.parent().store.add_account(account_name)
         QMessageBox.information(self, "Success", f"Account '{account_name}' created successfully.")
         self.close()
 
@@ -398,7 +760,7 @@ class AccountManager(QDialog):
 
         # 已创建账户列表
         self.list_widget = QListWidget()
-        for account in self.parent().data["accounts"]:
+        for account in self.parent().store.list_accounts():
             item = QListWidgetItem(account["name"])
             item.setData(Qt.UserRole, account)
             self.list_widget.addItem(item)
@@ -432,9 +794,10 @@ class AccountManager(QDialog):
         account_data = selected_item.data(Qt.UserRole)
         new_name, ok = QInputDialog.getText(self, "Edit Account", "Enter new account name:", text=account_data["name"])
         if ok and new_name:
+            self.parent().store.rename_account(account_data["id"], new_name)
             account_data["name"] = new_name
+            selected_item.setData(Qt.UserRole, account_data)
             selected_item.setText(new_name)
-            save_installed_data(self.parent().data)
             QMessageBox.information(self, "Success", f"Account name changed to '{new_name}'.")
 
     def delete_account(self):
@@ -446,8 +809,7 @@ class AccountManager(QDialog):
         confirm = QMessageBox.question(self, "Confirm", "Are you sure you want to delete this account?")
         if confirm == QMessageBox.Yes:
             account_data = selected_item.data(Qt.UserRole)
-            self.parent().data["accounts"] = [a for a in self.parent().data["accounts"] if a["name"] != account_data["name"]]
-            save_installed_data(self.parent().data)
+            self.parent().store.remove_account(account_data["id"])
             self.list_widget.takeItem(self.list_widget.row(selected_item))
             QMessageBox.information(self, "Success", "Account deleted successfully.")
 
@@ -462,7 +824,7 @@ class VersionManager(QDialog):
 
         # 已安装版本列表
         self.list_widget = QListWidget()
-        for version in self.parent().data["versions"]:
+        for version in self.parent().store.list_versions():
             item = QListWidgetItem(f"{version['display_name']} [{version['type']}]")
             item.setData(Qt.UserRole, version)
             self.list_widget.addItem(item)
@@ -477,13 +839,21 @@ class VersionManager(QDialog):
     def show_context_menu(self, position):
         menu = QMenu(self)
         open_folder_action = QAction(self.parent().language["open_folder"], self)
+        repair_action = QAction(self.parent().language["repair_version"], self)
+        upgrade_action = QAction(self.parent().language["upgrade_version"], self)
         delete_action = QAction(self.parent().language["delete_version"], self)
         menu.addAction(open_folder_action)
+        menu.addAction(repair_action)
+        menu.addAction(upgrade_action)
         menu.addAction(delete_action)
         action = menu.exec_(self.list_widget.viewport().mapToGlobal(position))
 
         if action == open_folder_action:
             self.open_folder()
+        elif action == repair_action:
+            self.repair_version()
+        elif action == upgrade_action:
+            self.upgrade_version()
         elif action == delete_action:
             self.delete_version()
 
@@ -500,6 +870,26 @@ class VersionManager(QDialog):
         folder_path = os.path.join(".minecraft", "versions", selected_version)
         os.startfile(folder_path)
 
+    def repair_version(self):
+        selected_item = self.list_widget.currentItem()
+        if not selected_item:
+            QMessageBox.information(self, "Info", "Please select a version to repair.")
+            return
+        self.parent().queue_repair(selected_item.data(Qt.UserRole)["name"])
+        self.parent().open_jobs_window()
+
+    def upgrade_version(self):
+        selected_item = self.list_widget.currentItem()
+        if not selected_item:
+            QMessageBox.information(self, "Info", "Please select a version to upgrade.")
+            return
+        old_version = selected_item.data(Qt.UserRole)["name"]
+        new_version, ok = QInputDialog.getText(self, self.parent().language["upgrade_version"], "Target version:")
+        if ok and new_version.strip():
+            self.parent().queue_upgrade(old_version, new_version.strip())
+            self.parent().open_jobs_window()
+            self.close()
+
     def delete_version(self):
         selected_item = self.list_widget.currentItem()
         if not selected_item:
@@ -510,8 +900,8 @@ class VersionManager(QDialog):
         if confirm == QMessageBox.Yes:
             version_data = selected_item.data(Qt.UserRole)
             selected_version = version_data["name"]
-            self.parent().data["versions"] = [v for v in self.parent().data["versions"] if v["name"] != selected_version]
-            save_installed_data(self.parent().data)
+            self.parent().store.remove_version(selected_version)
+            self.parent().queue_delete(selected_version)
             self.list_widget.takeItem(self.list_widget.row(selected_item))
             QMessageBox.information(self, "Success", "Version deleted successfully.")
 
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+import requests
+from http_client import get_client
+
+MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
+CACHE_DIR = os.path.join(".minecraft", "cache")
+# 清单缓存的有效期（秒），过期后使用 ETag / If-Modified-Since 重新验证
+DEFAULT_TTL = 600
+
+
+# 版本清单缓存：磁盘保存清单与各版本 JSON，内存中维护 id -> 条目 索引
+class ManifestCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, manifest_url=MANIFEST_URL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.manifest_url = manifest_url
+        self.manifest_path = os.path.join(cache_dir, "version_manifest.json")
+        self.meta_path = os.path.join(cache_dir, "version_manifest.meta.json")
+        self.versions_dir = os.path.join(cache_dir, "versions")
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._index = {}
+        self._meta = None
+
+    def _read_json(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_json(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _set_manifest(self, manifest):
+        self._manifest = manifest
+        self._index = {entry["id"]: entry for entry in manifest.get("versions", [])}
+
+    def _load_from_disk(self):
+        if self._manifest is not None:
+            return
+        manifest = self._read_json(self.manifest_path)
+        meta = self._read_json(self.meta_path)
+        if manifest is not None and meta is not None:
+            self._set_manifest(manifest)
+            self._meta = meta
+
+    # 获取版本清单；缓存未过期时不发起任何网络请求
+    def get_manifest(self, force=False):
+        with self._lock:
+            self._load_from_disk()
+            if not force and self._manifest is not None and time.time() - self._meta["fetched_at"] < self.ttl:
+                return self._manifest
+
+            headers = {}
+            if self._manifest is not None:
+                if self._meta.get("etag"):
+                    headers["If-None-Match"] = self._meta["etag"]
+                if self._meta.get("last_modified"):
+                    headers["If-Modified-Since"] = self._meta["last_modified"]
+
+            try:
+                response = get_client().get(self.manifest_url, headers=headers)
+            except requests.RequestException:
+                # 网络不可用时退回到已有缓存
+                return self._manifest
+
+            if response.status_code == 304:
+                self._meta["fetched_at"] = time.time()
+                self._write_json(self.meta_path, self._meta)
+                return self._manifest
+            if response.status_code != 200:
+                return self._manifest
+
+            manifest = response.json()
+            self._meta = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time()
+            }
+            self._write_json(self.manifest_path, manifest)
+            self._write_json(self.meta_path, self._meta)
+            self._set_manifest(manifest)
+            return self._manifest
+
+    # O(1) 查找清单条目
+    def get_entry(self, version):
+        if self.get_manifest() is None:
+            return None
+        entry = self._index.get(version)
+        if entry is None:
+            # 本地清单可能尚未包含新发布的版本，强制重新验证一次
+            self.get_manifest(force=True)
+            entry = self._index.get(version)
+        return entry
+
+    def get_version_ids(self):
+        manifest = self.get_manifest()
+        if manifest is None:
+            return None
+        return [entry["id"] for entry in manifest["versions"]]
+
+    # 获取版本 JSON；清单中的 url 含有内容哈希，url 不变则缓存永远有效
+    def get_version_json(self, version):
+        entry = self.get_entry(version)
+        if entry is None:
+            return None
+
+        cache_path = os.path.join(self.versions_dir, f"{version}.json")
+        cached = self._read_json(cache_path)
+        if cached is not None and cached.get("url") == entry["url"]:
+            return cached["data"]
+
+        try:
+            response = get_client().get(entry["url"])
+        except requests.RequestException:
+            return cached["data"] if cached is not None else None
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        self._write_json(cache_path, {"url": entry["url"], "data": data})
+        return data
+
+
+# 所有下载路径共享的清单缓存
+manifest_cache = ManifestCache()
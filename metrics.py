@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# 安装、校验和启动过程的计时与计数；可以导出为 JSON lines 事件流或 Prometheus 文本格式
+PREFIX = "pyl_"
+# 内存中保留的最近事件数，供统计窗口展示和导出
+EVENT_BUFFER = 1000
+# 设置后把事件实时追加到该文件（JSON lines）
+JSONL_ENV = "PYL_METRICS_JSONL"
+
+
+def _labels_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    escaped = ((name, value.replace("\\", "\\\\").replace('"', '\\"')) for name, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metrics:
+    def __init__(self, max_events=EVENT_BUFFER):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {}
+        self._gauges = {}
+        # 汇总：(名称, 标签) -> [次数, 总和, 最大值]
+        self._summaries = {}
+        self.events = deque(maxlen=max_events)
+        self._jsonl = None
+        if os.environ.get(JSONL_ENV):
+            self.open_jsonl(os.environ[JSONL_ENV])
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _labels_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            summary = self._summaries.setdefault(key, [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def event(self, kind, **fields):
+        record = {"event": kind, "time": round(time.time(), 3)}
+        record.update(fields)
+        with self._lock:
+            self.events.append(record)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(record) + "\n")
+                self._jsonl.flush()
+
+    # 计时区间：记录耗时和结果，嵌套的区间记录父区间名称；调用方可以往返回的字典中补充属性
+    @contextmanager
+    def span(self, name, **attributes):
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            self.observe("span_seconds", duration, span=name)
+            if status != "ok":
+                self.incr("span_errors_total", span=name)
+            self.event("span", name=name, parent=parent, duration=round(duration, 6), status=status, **attributes)
+
+    def open_jsonl(self, path):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+            self._jsonl = open(path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+    # 当前所有指标：[(名称, 标签, 值)]，汇总指标展开为 _count、_sum、_max
+    def snapshot(self):
+        with self._lock:
+            rows = [(name, dict(key), value) for (name, key), value in self._counters.items()]
+            rows.extend((name, dict(key), value) for (name, key), value in self._gauges.items())
+            for (name, key), (count, total, maximum) in self._summaries.items():
+                rows.append((f"{name}_count", dict(key), count))
+                rows.append((f"{name}_sum", dict(key), total))
+                rows.append((f"{name}_max", dict(key), maximum))
+        return sorted(rows, key=lambda row: (row[0], sorted(row[1].items())))
+
+    def prometheus_text(self):
+        with self._lock:
+            families = [(self._counters, "counter"), (self._gauges, "gauge")]
+            lines = []
+            for values, kind in families:
+                for name in sorted({name for name, _ in values}):
+                    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                    for (metric, key), value in sorted(values.items()):
+                        if metric == name:
+                            lines.append(f"{PREFIX}{name}{_format_labels(key)} {value}")
+            for name in sorted({name for name, _ in self._summaries}):
+                lines.append(f"# TYPE {PREFIX}{name} summary")
+                for (metric, key), (count, total, _) in sorted(self._summaries.items()):
+                    if metric == name:
+                        lines.append(f"{PREFIX}{name}_count{_format_labels(key)} {count}")
+                        lines.append(f"{PREFIX}{name}_sum{_format_labels(key)} {total}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    # 把内存中的最近事件写成 JSON lines 文件
+    def write_jsonl(self, path):
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w", encoding="utf-8") as f:
+            for record in events:
+                f.write(json.dumps(record) + "\n")
+
+
+metrics = Metrics()
@@ -0,0 +1,182 @@
+import os
+import json
+import shutil
+import threading
+
+STORE_DIR = os.path.join(".minecraft", "store")
+# Linux 上 FICLONE ioctl 的编号，用于在支持的文件系统上创建 reflink
+FICLONE = 0x40049409
+
+
+# 目标文件以独占方式创建：已存在的路径可能是对象库中对象的硬链接，绝不能截断
+def _reflink(src, dst):
+    import fcntl
+    with open(src, "rb") as s, open(dst, "xb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def _copy(src, dst):
+    with open(src, "rb") as s, open(dst, "xb") as d:
+        shutil.copyfileobj(s, d)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# 每个线程使用自己的临时路径，避免并发链接同一目标时互相干扰
+def _tmp_path(dest, suffix):
+    return f"{dest}.{os.getpid()}-{threading.get_ident()}{suffix}"
+
+
+# 按 SHA1 寻址的共享对象库，各版本通过硬链接或 reflink 引用其中的对象
+class ObjectStore:
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.refs_path = os.path.join(store_dir, "refs.json")
+        self._lock = threading.Lock()
+        self._refs = None
+        self._counts = None
+        self._object_counts = None
+        self._path_counts = None
+        self._object_locks = {}
+
+    def object_path(self, sha1):
+        return os.path.join(self.store_dir, sha1[:2], sha1)
+
+    def has(self, sha1):
+        return os.path.isfile(self.object_path(sha1))
+
+    # 目标路径已经是对象库中对象的链接时无需再校验哈希
+    def is_linked(self, sha1, dest):
+        try:
+            return os.path.samefile(self.object_path(sha1), dest)
+        except OSError:
+            return False
+
+    # 同一对象同一时间只允许一个线程下载或导入
+    def object_lock(self, sha1):
+        with self._lock:
+            return self._object_locks.setdefault(sha1, threading.Lock())
+
+    # 把磁盘上已校验过的文件导入对象库；调用方需持有 object_lock(sha1)
+    def adopt(self, sha1, path):
+        dest = self.object_path(sha1)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.link(path, dest)
+        except OSError:
+            tmp_path = _tmp_path(dest, ".tmp")
+            _remove(tmp_path)
+            try:
+                _copy(path, tmp_path)
+                os.replace(tmp_path, dest)
+            finally:
+                _remove(tmp_path)
+
+    # 依次尝试硬链接、reflink，最后退回到复制；先在临时路径上建好，再原子地替换目标
+    def link(self, sha1, dest):
+        src = self.object_path(sha1)
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        tmp_path = _tmp_path(dest, ".link")
+        with self.object_lock(sha1):
+            _remove(tmp_path)
+            try:
+                try:
+                    os.link(src, tmp_path)
+                except OSError:
+                    try:
+                        _reflink(src, tmp_path)
+                    except (OSError, ImportError):
+                        # reflink 失败时可能已经创建了空文件
+                        _remove(tmp_path)
+                        _copy(src, tmp_path)
+                os.replace(tmp_path, dest)
+            finally:
+                _remove(tmp_path)
+
+    # 引用索引：owner（版本 id）-> [[sha1, 路径], ...]
+    def _load_refs(self):
+        if self._refs is not None:
+            return
+        try:
+            with open(self.refs_path, "r", encoding="utf-8") as f:
+                self._refs = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._refs = {}
+        self._counts = {}
+        self._object_counts = {}
+        self._path_counts = {}
+        for entries in self._refs.values():
+            self._add_counts(entries)
+
+    def _save_refs(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.refs_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._refs, f)
+        os.replace(tmp_path, self.refs_path)
+
+    def _add_counts(self, entries):
+        for sha1, path in entries:
+            key = (sha1, path)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._object_counts[sha1] = self._object_counts.get(sha1, 0) + 1
+            self._path_counts[path] = self._path_counts.get(path, 0) + 1
+
+    def _drop(self, entries):
+        freed = []
+        for sha1, path in entries:
+            key = (sha1, path)
+            self._counts[key] -= 1
+            self._object_counts[sha1] -= 1
+            if self._counts[key] == 0:
+                del self._counts[key]
+            self._path_counts[path] -= 1
+            if self._path_counts[path] == 0:
+                del self._path_counts[path]
+                # 没有任何版本再引用的路径随之删除；该路径已被换成其他对象时保留
+                if self.is_linked(sha1, path):
+                    os.remove(path)
+            if self._object_counts[sha1] == 0:
+                del self._object_counts[sha1]
+                if self.has(sha1):
+                    os.remove(self.object_path(sha1))
+                    freed.append(sha1)
+        return freed
+
+    # 记录某个版本引用的全部对象，替换该版本之前的引用；返回被释放的对象
+    # 安装前先登记将要链接的对象，期间删除其他版本不会回收它们
+    def register(self, owner, entries):
+        with self._lock:
+            self._load_refs()
+            entries = [[sha1, path] for sha1, path in entries]
+            self._add_counts(entries)
+            old_entries = self._refs.get(owner, [])
+            self._refs[owner] = entries
+            freed = self._drop(old_entries)
+            self._save_refs()
+            return freed
+
+    # 重新链接某个版本引用、但已被替换或删除的文件（例如与其他版本共用路径的资源索引）
+    def restore(self, owner):
+        with self._lock:
+            self._load_refs()
+            entries = list(self._refs.get(owner, []))
+        for sha1, path in entries:
+            if self.has(sha1) and not self.is_linked(sha1, path):
+                self.link(sha1, path)
+
+    # 释放某个版本的全部引用，删除不再被任何版本使用的对象；返回被释放的对象
+    def release(self, owner):
+        with self._lock:
+            self._load_refs()
+            freed = self._drop(self._refs.pop(owner, []))
+            self._save_refs()
+            return freed
+
+
+object_store = ObjectStore()
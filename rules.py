@@ -0,0 +1,53 @@
+import sys
+import platform
+
+
+# 当前系统在版本 JSON 中的名称
+def os_name():
+    if sys.platform.startswith("win"):
+        return "windows"
+    if sys.platform == "darwin":
+        return "osx"
+    return "linux"
+
+
+def os_arch():
+    machine = platform.machine().lower()
+    if machine in ("x86", "i386", "i686"):
+        return "x86"
+    if machine in ("arm64", "aarch64"):
+        return "arm64"
+    return "x86_64"
+
+
+def _rule_matches(rule, features):
+    os_rule = rule.get("os")
+    if os_rule:
+        if "name" in os_rule and os_rule["name"] != os_name():
+            return False
+        if "arch" in os_rule and os_rule["arch"] != os_arch():
+            return False
+    for name, value in rule.get("features", {}).items():
+        if features.get(name, False) != value:
+            return False
+    return True
+
+
+# 计算 rules 列表的结果：最后一条匹配的规则决定是否允许
+def rules_allow(rules, features=None):
+    if not rules:
+        return True
+    features = features or {}
+    allowed = False
+    for rule in rules:
+        if _rule_matches(rule, features):
+            allowed = rule["action"] == "allow"
+    return allowed
+
+
+# 库文件在当前系统上使用的 natives 分类名
+def natives_classifier(library):
+    natives = library.get("natives")
+    if not natives or os_name() not in natives:
+        return None
+    return natives[os_name()].replace("${arch}", "32" if os_arch() == "x86" else "64")
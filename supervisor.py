@@ -0,0 +1,98 @@
+import re
+import time
+import threading
+import itertools
+import subprocess
+from collections import deque
+from metrics import metrics
+
+# 每个实例在内存中保留的日志行数
+LOG_BUFFER_LINES = 5000
+# 出现这些日志行时认为游戏已进入世界，用于统计启动耗时
+WORLD_LOADED_PATTERN = re.compile(r"Preparing spawn area|Loaded \d+ advancements|joined the game|Connecting to")
+
+
+# 一个正在运行（或已退出）的游戏进程
+class Instance:
+    def __init__(self, instance_id, name, command, cwd=None):
+        self.id = instance_id
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.process = None
+        self.lines = deque(maxlen=LOG_BUFFER_LINES)
+        # 累计输出的行数，用于增量读取环形缓冲区
+        self.line_count = 0
+        self.spawned_at = None
+        self.loaded_at = None
+        self.exited_at = None
+        self.exit_code = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.spawned_at = time.monotonic()
+        self.process = subprocess.Popen(
+            self.command, cwd=self.cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL, text=True, encoding="utf-8", errors="replace", bufsize=1
+        )
+        threading.Thread(target=self._read_output, name=f"instance-{self.id}", daemon=True).start()
+
+    def _read_output(self):
+        for line in self.process.stdout:
+            line = line.rstrip("\n")
+            with self._lock:
+                self.lines.append(line)
+                self.line_count += 1
+            if self.loaded_at is None and WORLD_LOADED_PATTERN.search(line):
+                self.loaded_at = time.monotonic()
+                metrics.observe("game_startup_seconds", self.startup_time())
+        self.process.stdout.close()
+        self.exit_code = self.process.wait()
+        self.exited_at = time.monotonic()
+        metrics.incr("game_exits_total", code=self.exit_code)
+
+    def is_running(self):
+        return self.process is not None and self.exit_code is None
+
+    # 从进程启动到第一次进入世界的耗时（秒），尚未进入时为 None
+    def startup_time(self):
+        if self.loaded_at is None:
+            return None
+        return self.loaded_at - self.spawned_at
+
+    # 返回第 since 行之后的新日志以及新的行号；已被挤出缓冲区的行会被跳过
+    def read_lines(self, since=0):
+        with self._lock:
+            first = self.line_count - len(self.lines)
+            start = max(since, first)
+            return list(itertools.islice(self.lines, start - first, None)), self.line_count
+
+    def stop(self):
+        if self.is_running():
+            self.process.terminate()
+
+
+# 管理多个同时运行的游戏实例
+class Supervisor:
+    def __init__(self):
+        self.instances = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # 进程启动成功后才登记实例，启动失败（OSError）时不留下记录
+    def launch(self, name, command, cwd=None):
+        with self._lock:
+            instance = Instance(next(self._ids), name, command, cwd)
+        instance.start()
+        with self._lock:
+            self.instances[instance.id] = instance
+        return instance
+
+    # 移除已退出实例的记录
+    def prune(self):
+        with self._lock:
+            for instance_id in [i for i, instance in self.instances.items() if not instance.is_running()]:
+                del self.instances[instance_id]
+
+
+supervisor = Supervisor()
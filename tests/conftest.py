@@ -0,0 +1,19 @@
+import os
+import sys
+import hashlib
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+def sha1_of(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+# 启动器的路径都相对于工作目录，每个测试在独立的临时目录中运行
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,20 @@
+from core import LauncherError, run_batch
+
+
+def fail_some(task):
+    if task == "missing":
+        raise LauncherError("Version missing not found.")
+    if task == "disk":
+        raise OSError("No space left on device")
+    return task.upper()
+
+
+# 一个任务抛出任意异常时，其他任务照常完成，每个任务都有结果
+def test_run_batch_reports_every_task():
+    done = []
+    results = dict(run_batch(fail_some, ["a", "missing", "disk", "b"], 2, lambda task, result: done.append(task)))
+
+    assert results["a"] == "A" and results["b"] == "B"
+    assert isinstance(results["missing"], LauncherError)
+    assert isinstance(results["disk"], LauncherError) and "No space left" in str(results["disk"])
+    assert sorted(done) == ["a", "b", "disk", "missing"]
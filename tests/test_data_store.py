@@ -0,0 +1,58 @@
+import os
+import json
+from data_store import InstalledDataStore
+
+LEGACY_DATA = {
+    "versions": [{"name": "1.20.1", "display_name": "Survival", "type": "original"},
+                 {"name": "1.20.1-fabric-0.15.11", "type": "fabric"}],
+    "accounts": [{"name": "Steve"}]
+}
+
+
+def write_legacy_data():
+    with open("versions.json", "w", encoding="utf-8") as f:
+        json.dump(LEGACY_DATA, f)
+
+
+def test_legacy_data_is_migrated_once():
+    write_legacy_data()
+    store = InstalledDataStore()
+
+    assert [(version["name"], version["display_name"], version["type"]) for version in store.list_versions()] == [
+        ("1.20.1", "Survival", "original"), ("1.20.1-fabric-0.15.11", "1.20.1-fabric-0.15.11", "fabric")
+    ]
+    assert [account["name"] for account in store.list_accounts()] == ["Steve"]
+    assert not os.path.exists("versions.json")
+    assert os.path.exists("versions.json.migrated")
+    store.close()
+
+    # 迁移过一次后，再出现的 versions.json 不会被重复导入
+    write_legacy_data()
+    store = InstalledDataStore()
+    assert len(store.list_versions()) == 2
+    assert os.path.exists("versions.json")
+    store.close()
+
+
+def test_without_legacy_data_starts_empty():
+    store = InstalledDataStore()
+    assert not store.has_versions()
+    assert store.first_account() is None
+    store.close()
+
+
+def test_instance_metadata_follows_its_version():
+    store = InstalledDataStore()
+    store.add_version("1.20.1", "1.20.1", "original")
+    assert store.get_instance("1.20.1") is None
+    store.set_instance("1.20.1", {"gcPreset": "zgc", "appcds": False})
+    store.set_instance("1.20.1", {"gcPreset": "g1", "appcds": False})
+
+    store.replace_version("1.20.1", "1.20.4")
+    assert store.get_instance("1.20.1") is None
+    assert store.get_instance("1.20.4") == {"gcPreset": "g1", "appcds": False}
+    assert [(version["name"], version["display_name"]) for version in store.list_versions()] == [("1.20.4", "1.20.4")]
+
+    store.remove_version("1.20.4")
+    assert store.get_instance("1.20.4") is None
+    store.close()
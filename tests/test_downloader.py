@@ -0,0 +1,124 @@
+import os
+import json
+import random
+import threading
+import pytest
+from conftest import sha1_of
+from fake_server import RepositoryHandler, start_server
+import downloader
+from downloader import download_file, PART_SUFFIX, STATE_SUFFIX
+from http_client import HttpClient
+
+DATA = random.Random(1).randbytes(3 * 1024 * 1024 + 123)
+
+
+class Repository:
+    def __init__(self, files):
+        self.files = files
+
+
+# 记录每个请求的 Range 头；truncate 中的路径第一次请求时只返回一半数据就断开连接
+class RecordingHandler(RepositoryHandler):
+    ranges = []
+    truncate = set()
+
+    def do_GET(self):
+        self.ranges.append(self.headers.get("Range"))
+        if self.path in self.truncate:
+            self.truncate.discard(self.path)
+            data = self.repository.files[self.path]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data[:len(data) // 2])
+            self.close_connection = True
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def server():
+    server = start_server(Repository({"/file.bin": DATA}))
+    server.RequestHandlerClass = type("Handler", (RecordingHandler, server.RequestHandlerClass), {
+        "ranges": [], "truncate": set()
+    })
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def artifact_for(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+    return dict(url=url, path=os.path.join("out", "file.bin"), sha1=sha1_of(DATA), size=len(DATA))
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_download_replaces_target_atomically(server):
+    artifact = artifact_for(server)
+    download_file(HttpClient(mirrors=[]), artifact)
+    assert read(artifact["path"]) == DATA
+    assert not os.path.exists(artifact["path"] + PART_SUFFIX)
+    assert not os.path.exists(artifact["path"] + STATE_SUFFIX)
+
+
+def test_resume_from_saved_state(server):
+    artifact = artifact_for(server)
+    done = 1024 * 1024
+    os.makedirs("out")
+    with open(artifact["path"] + PART_SUFFIX, "wb") as f:
+        f.write(DATA[:done])
+    with open(artifact["path"] + STATE_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"url": artifact["url"], "sha1": artifact["sha1"],
+                   "segments": [{"start": 0, "end": None, "done": done}]}, f)
+
+    download_file(HttpClient(mirrors=[]), artifact)
+    assert server.RequestHandlerClass.ranges == [f"bytes={done}-"]
+    assert read(artifact["path"]) == DATA
+
+
+# 暂存数据属于另一个地址时不能拼接，必须重新下载
+def test_state_for_another_url_is_discarded(server):
+    artifact = artifact_for(server)
+    os.makedirs("out")
+    with open(artifact["path"] + PART_SUFFIX, "wb") as f:
+        f.write(b"x" * 1024)
+    with open(artifact["path"] + STATE_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"url": artifact["url"] + "?old", "sha1": artifact["sha1"],
+                   "segments": [{"start": 0, "end": None, "done": 1024}]}, f)
+
+    download_file(HttpClient(mirrors=[]), artifact)
+    assert server.RequestHandlerClass.ranges == [None]
+    assert read(artifact["path"]) == DATA
+
+
+def test_interrupted_download_continues_from_written_data(server):
+    artifact = artifact_for(server)
+    server.RequestHandlerClass.truncate.add("/file.bin")
+    download_file(HttpClient(mirrors=[]), artifact)
+
+    ranges = server.RequestHandlerClass.ranges
+    assert ranges[0] is None and len(ranges) == 2
+    assert ranges[1].startswith("bytes=") and ranges[1] != "bytes=0-"
+    assert read(artifact["path"]) == DATA
+
+
+def test_segmented_download(server, monkeypatch):
+    monkeypatch.setattr(downloader, "SEGMENT_THRESHOLD", 1024 * 1024)
+    artifact = artifact_for(server)
+    download_file(HttpClient(mirrors=[]), artifact)
+    assert len(server.RequestHandlerClass.ranges) == downloader.SEGMENT_COUNT
+    assert read(artifact["path"]) == DATA
+
+
+def test_hash_mismatch_discards_partial_data(server):
+    artifact = dict(artifact_for(server), sha1="0" * 40)
+    with pytest.raises(IOError):
+        download_file(HttpClient(mirrors=[]), artifact)
+    assert not os.path.exists(artifact["path"])
+    assert not os.path.exists(artifact["path"] + PART_SUFFIX)
@@ -0,0 +1,20 @@
+from jvm_tuning import vm_stat_available, heap_size_mb, MB, MIN_HEAP_MB
+
+VM_STAT_OUTPUT = """Mach Virtual Memory Statistics: (page size of 16384 bytes)
+Pages free:                               12000.
+Pages active:                            400000.
+Pages inactive:                          180000.
+Pages speculative:                         3000.
+Pages wired down:                        150000.
+"""
+
+
+def test_vm_stat_counts_free_and_inactive_pages():
+    assert vm_stat_available(VM_STAT_OUTPUT) == (12000 + 180000) * 16384
+    assert vm_stat_available("") is None
+
+
+def test_heap_size_is_limited_by_available_memory():
+    assert heap_size_mb(None, 0) == 2048
+    assert heap_size_mb(2048 * MB, 0) == 1536
+    assert heap_size_mb(512 * MB, 100) == MIN_HEAP_MB
@@ -0,0 +1,152 @@
+import os
+import json
+import zipfile
+import pytest
+import rules
+from rules import rules_allow
+from installer import version_dir, libraries_dir
+from launch_profile import (
+    PLACEHOLDER_PATTERN, compile_launch_profile, load_launch_profile, merge_version_json, build_command,
+    version_json_path, offline_uuid
+)
+
+# 1.8.9 风格：只有 minecraftArguments，natives 按系统给出分类
+LEGACY_JSON = {
+    "id": "1.8.9",
+    "type": "release",
+    "mainClass": "net.minecraft.client.main.Main",
+    "assets": "1.8",
+    "minecraftArguments": "--username ${auth_player_name} --version ${version_name} --gameDir ${game_directory} "
+                          "--assetsDir ${assets_root} --assetIndex ${assets_index_name} --uuid ${auth_uuid} "
+                          "--accessToken ${auth_access_token} --userProperties ${user_properties} "
+                          "--userType ${user_type}",
+    "libraries": [
+        {"name": "com.mojang:netty:1.6",
+         "downloads": {"artifact": {"path": "com/mojang/netty/1.6/netty-1.6.jar"}}},
+        {"name": "org.lwjgl.lwjgl:lwjgl-platform:2.9.4",
+         "downloads": {"classifiers": {
+             "natives-linux": {"path": "org/lwjgl/lwjgl-platform-natives-linux.jar"},
+             "natives-osx": {"path": "org/lwjgl/lwjgl-platform-natives-osx.jar"},
+             "natives-windows": {"path": "org/lwjgl/lwjgl-platform-natives-windows.jar"}
+         }},
+         "natives": {"linux": "natives-linux", "osx": "natives-osx", "windows": "natives-windows"},
+         "extract": {"exclude": ["META-INF/"]}},
+        {"name": "tv.twitch:twitch:6.5",
+         "downloads": {"artifact": {"path": "tv/twitch/twitch/6.5/twitch-6.5.jar"}},
+         "rules": [{"action": "allow"}, {"action": "disallow", "os": {"name": "linux"}}]}
+    ]
+}
+
+# 1.20 风格：arguments 中带规则的参数
+MODERN_JSON = {
+    "id": "1.20.1",
+    "type": "release",
+    "mainClass": "net.minecraft.client.main.Main",
+    "assets": "5",
+    "arguments": {
+        "game": ["--username", "${auth_player_name}", "--version", "${version_name}",
+                 "--accessToken", "${auth_access_token}",
+                 {"rules": [{"action": "allow", "features": {"is_demo_user": True}}], "value": "--demo"}],
+        "jvm": [{"rules": [{"action": "allow", "os": {"name": "osx"}}], "value": ["-XstartOnFirstThread"]},
+                "-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]
+    },
+    "libraries": [
+        {"name": "com.mojang:brigadier:1.1.8",
+         "downloads": {"artifact": {"path": "com/mojang/brigadier/1.1.8/brigadier-1.1.8.jar"}}}
+    ]
+}
+
+
+def install(version_json):
+    version = version_json["id"]
+    os.makedirs(version_dir(version), exist_ok=True)
+    with open(os.path.join(version_dir(version), f"{version}.json"), "w", encoding="utf-8") as f:
+        json.dump(version_json, f)
+    for library in version_json["libraries"]:
+        for native in library["downloads"].get("classifiers", {}).values():
+            path = os.path.join(libraries_dir(), native["path"])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with zipfile.ZipFile(path, "w") as jar:
+                jar.writestr("liblwjgl.so", b"native")
+                jar.writestr("META-INF/MANIFEST.MF", b"")
+    return version
+
+
+@pytest.fixture
+def linux(monkeypatch):
+    monkeypatch.setattr(rules, "os_name", lambda: "linux")
+    monkeypatch.setattr(rules, "os_arch", lambda: "x86_64")
+
+
+def test_rules_last_matching_rule_wins(linux):
+    assert rules_allow(None)
+    assert rules_allow([{"action": "allow"}])
+    assert not rules_allow([{"action": "allow"}, {"action": "disallow", "os": {"name": "linux"}}])
+    assert not rules_allow([{"action": "allow", "os": {"name": "osx"}}])
+    assert rules_allow([{"action": "allow", "features": {"is_demo_user": True}}], {"is_demo_user": True})
+    assert not rules_allow([{"action": "allow", "features": {"is_demo_user": True}}])
+
+
+def test_merge_version_json_replaces_libraries_and_appends_arguments():
+    child = {
+        "id": "1.20.1-fabric",
+        "inheritsFrom": "1.20.1",
+        "mainClass": "net.fabricmc.loader.impl.launch.knot.KnotClient",
+        "arguments": {"jvm": ["-DFabricMcEmu=net.minecraft.client.main.Main"]},
+        "libraries": [{"name": "com.mojang:brigadier:1.2.0"}, {"name": "net.fabricmc:fabric-loader:0.15.11"}]
+    }
+    merged = merge_version_json(MODERN_JSON, child)
+
+    assert merged["mainClass"] == child["mainClass"]
+    assert "inheritsFrom" not in merged
+    assert [library["name"] for library in merged["libraries"]] == [
+        "com.mojang:brigadier:1.2.0", "net.fabricmc:fabric-loader:0.15.11"
+    ]
+    assert merged["arguments"]["jvm"][-1] == "-DFabricMcEmu=net.minecraft.client.main.Main"
+    assert merged["arguments"]["game"] == MODERN_JSON["arguments"]["game"]
+
+
+def test_legacy_profile_fills_every_placeholder(linux):
+    version = install(LEGACY_JSON)
+    profile = compile_launch_profile(version)
+    command = build_command(profile, "Steve")
+
+    assert not [argument for argument in command if PLACEHOLDER_PATTERN.search(argument)]
+    assert command[command.index("--userProperties") + 1] == "{}"
+    assert command[command.index("--uuid") + 1] == offline_uuid("Steve")
+    assert command[command.index("--assetIndex") + 1] == "1.8"
+
+    classpath = command[command.index("-cp") + 1].split(os.pathsep)
+    assert classpath[-1].endswith(os.path.join("1.8.9", "1.8.9.jar"))
+    assert any(path.endswith("netty-1.6.jar") for path in classpath)
+    assert not any("twitch" in path for path in classpath)
+    natives_dir = command[command.index("-cp") - 1].partition("=")[2]
+    assert os.listdir(natives_dir) == ["liblwjgl.so"]
+
+
+def test_modern_profile_applies_argument_rules(linux):
+    version = install(MODERN_JSON)
+    command = build_command(compile_launch_profile(version), "Alex")
+
+    assert not [argument for argument in command if PLACEHOLDER_PATTERN.search(argument)]
+    assert "-XstartOnFirstThread" not in command
+    assert "--demo" not in command
+    assert command[command.index("--version") + 1] == "1.20.1"
+    assert command.index("net.minecraft.client.main.Main") < command.index("--username")
+
+
+# 继承链上任何一个版本 JSON 变化后，缓存的启动配置都要重新编译
+def test_inherited_profile_recompiles_when_parent_changes(linux):
+    parent = install(MODERN_JSON)
+    child = install({"id": "1.20.1-fabric-0.15.11", "inheritsFrom": parent, "libraries": [],
+                     "mainClass": "net.fabricmc.loader.impl.launch.knot.KnotClient"})
+    profile = load_launch_profile(child)
+    assert profile["mainClass"] == "net.fabricmc.loader.impl.launch.knot.KnotClient"
+    classpath = profile["jvmArguments"][profile["jvmArguments"].index("-cp") + 1].split(os.pathsep)
+    assert classpath[-1] == os.path.abspath(os.path.join(version_dir(parent), f"{parent}.jar"))
+
+    library = {"name": "org.lwjgl:lwjgl:3.3.1", "downloads": {"artifact": {"path": "org/lwjgl/lwjgl-3.3.1.jar"}}}
+    with open(version_json_path(parent), "w", encoding="utf-8") as f:
+        json.dump(dict(MODERN_JSON, libraries=MODERN_JSON["libraries"] + [library]), f)
+    jvm_arguments = load_launch_profile(child)["jvmArguments"]
+    assert "lwjgl-3.3.1.jar" in jvm_arguments[jvm_arguments.index("-cp") + 1]
@@ -0,0 +1,130 @@
+import os
+import threading
+from conftest import sha1_of
+from object_store import ObjectStore
+
+DATA = b"library contents" * 1024
+
+
+def make_store(data=DATA):
+    store = ObjectStore("store")
+    sha1 = sha1_of(data)
+    os.makedirs("downloads", exist_ok=True)
+    source = os.path.join("downloads", sha1)
+    with open(source, "wb") as f:
+        f.write(data)
+    store.adopt(sha1, source)
+    return store, sha1
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_link_points_at_object():
+    store, sha1 = make_store()
+    store.link(sha1, os.path.join("a", "lib.jar"))
+    assert store.is_linked(sha1, os.path.join("a", "lib.jar"))
+    assert read(os.path.join("a", "lib.jar")) == DATA
+
+
+def test_concurrent_links_keep_object_intact():
+    store, sha1 = make_store()
+    paths = [os.path.join("libs", f"{i}.jar") for i in range(300)]
+    errors = []
+
+    def worker():
+        try:
+            for path in paths:
+                store.link(sha1, path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert read(store.object_path(sha1)) == DATA
+    assert all(read(path) == DATA for path in paths)
+    assert not [name for name in os.listdir("libs") if not name.endswith(".jar")]
+
+
+# 硬链接不可用时退回到 reflink 或复制，目标已是对象的链接也不能被截断
+def test_link_fallback_does_not_truncate_existing_link(monkeypatch):
+    store, sha1 = make_store()
+    store.link(sha1, "lib.jar")
+
+    def no_link(src, dst):
+        raise OSError("hard links not supported")
+    monkeypatch.setattr(os, "link", no_link)
+    store.link(sha1, "lib.jar")
+
+    assert read(store.object_path(sha1)) == DATA
+    assert read("lib.jar") == DATA
+
+
+def test_release_keeps_objects_still_referenced():
+    store, sha1 = make_store()
+    store.link(sha1, "lib.jar")
+    store.register("a", [(sha1, "lib.jar")])
+    store.register("b", [(sha1, "lib.jar")])
+
+    assert store.release("a") == []
+    assert read("lib.jar") == DATA
+    assert store.release("b") == [sha1]
+    assert not os.path.exists("lib.jar")
+    assert not store.has(sha1)
+
+
+def test_register_replaces_previous_refs():
+    store, sha1 = make_store()
+    store.link(sha1, "old.jar")
+    store.register("a", [(sha1, "old.jar")])
+    store.link(sha1, "new.jar")
+    store.register("a", [(sha1, "new.jar")])
+
+    assert not os.path.exists("old.jar")
+    assert read("new.jar") == DATA
+    assert store.has(sha1)
+
+
+# 两个版本共用同一资源索引路径但内容不同：释放旧版本不能删除新版本的文件
+def test_release_keeps_path_relinked_to_another_object():
+    store, old_sha1 = make_store(b"old index")
+    new_sha1 = make_store(b"new index")[1]
+    path = os.path.join("assets", "indexes", "8.json")
+    store.link(old_sha1, path)
+    store.register("old", [(old_sha1, path)])
+    store.link(new_sha1, path)
+    store.register("new", [(new_sha1, path)])
+
+    assert store.release("old") == [old_sha1]
+    assert read(path) == b"new index"
+    assert store.has(new_sha1)
+
+
+# 安装前登记的引用在下载期间保护共用的对象和路径
+def test_pinned_refs_survive_release_of_another_version():
+    store, sha1 = make_store()
+    store.link(sha1, "lib.jar")
+    store.register("a", [(sha1, "lib.jar")])
+    store.register("b", [(sha1, "lib.jar"), (sha1, "other.jar")])
+
+    store.release("a")
+    assert read("lib.jar") == DATA
+    store.link(sha1, "other.jar")
+    assert read("other.jar") == DATA
+
+
+def test_refs_persist_across_instances():
+    store, sha1 = make_store()
+    store.link(sha1, "lib.jar")
+    store.register("a", [(sha1, "lib.jar")])
+
+    reloaded = ObjectStore("store")
+    assert reloaded.release("a") == [sha1]
+    assert not os.path.exists("lib.jar")
@@ -0,0 +1,25 @@
+import sys
+import time
+import pytest
+from supervisor import Supervisor
+
+
+def test_launch_records_output_and_exit_code():
+    supervisor = Supervisor()
+    instance = supervisor.launch("test", [sys.executable, "-c", "print('Preparing spawn area'); raise SystemExit(3)"])
+    deadline = time.monotonic() + 10
+    while instance.is_running() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert instance.exit_code == 3
+    assert instance.read_lines() == (["Preparing spawn area"], 1)
+    assert instance.startup_time() is not None
+    assert list(supervisor.instances) == [instance.id]
+
+
+# 进程无法启动时不能留下 "exited with code None" 的实例
+def test_failed_launch_is_not_recorded():
+    supervisor = Supervisor()
+    with pytest.raises(OSError):
+        supervisor.launch("broken", ["/nonexistent/java"])
+    assert supervisor.instances == {}
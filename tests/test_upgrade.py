@@ -0,0 +1,226 @@
+import os
+import json
+import random
+import threading
+import pytest
+from conftest import sha1_of
+from fake_server import start_server, make_jar
+import core
+import installer
+import loaders
+import http_client
+import manifest_cache
+from core import LauncherError, upgrade_minecraft_version, verify_minecraft_version
+from downloader import DownloadCancelled
+from integrity import hash_cache
+from launch_profile import load_launch_profile
+from object_store import object_store
+
+FABRIC_MAIN_CLASS = "net.fabricmc.loader.impl.launch.knot.KnotClient"
+
+
+class Repository:
+    def __init__(self):
+        self.files = {}
+        self.base_url = None
+
+    def add(self, url_path, data):
+        self.files[url_path] = data
+        return {"url": self.base_url + url_path, "sha1": sha1_of(data), "size": len(data)}
+
+    # 两个版本使用同一个资源索引 id，但索引内容不同；两个版本都有同一个 Fabric 加载器 0.1
+    def build(self, base_url):
+        self.base_url = base_url
+        loader_jar = make_jar(random.Random(2), 512)
+        loader_library = dict(name="net.fabricmc:fabric-loader:0.1", url=base_url + "/maven/",
+                              sha1=sha1_of(loader_jar), size=len(loader_jar))
+        self.files["/maven/net/fabricmc/fabric-loader/0.1/fabric-loader-0.1.jar"] = loader_jar
+        rng = random.Random(1)
+        shared = rng.randbytes(4096)
+        objects = {"old": {"shared": shared, "old": rng.randbytes(2048)},
+                   "new": {"shared": shared, "new": rng.randbytes(2048)}}
+        entries = []
+        for version, assets in objects.items():
+            index = {"objects": {}}
+            for name, data in assets.items():
+                hash_ = sha1_of(data)
+                self.files[f"/resources/{hash_[:2]}/{hash_}"] = data
+                index["objects"][f"minecraft/textures/{name}"] = {"hash": hash_, "size": len(data)}
+            version_json = {
+                "id": version,
+                "type": "release",
+                "mainClass": "net.minecraft.client.main.Main",
+                "assets": "8",
+                "assetIndex": dict(id="8", **self.add(f"/indexes/{version}/8.json", json.dumps(index).encode())),
+                "downloads": {"client": self.add(f"/{version}/client.jar", make_jar(rng, 1024))},
+                "libraries": [],
+                "arguments": {"game": ["--version", "${version_name}"], "jvm": ["-cp", "${classpath}"]}
+            }
+            entry = self.add(f"/versions/{version}.json", json.dumps(version_json).encode())
+            entries.append({"id": version, "type": "release", "url": entry["url"],
+                            "time": "2024-01-01T00:00:00+00:00", "releaseTime": "2024-01-01T00:00:00+00:00"})
+            self.files[f"/fabric/versions/loader/{version}"] = json.dumps([{"loader": {"version": "0.1"}}]).encode()
+            self.files[f"/fabric/versions/loader/{version}/0.1/profile/json"] = json.dumps({
+                "id": f"fabric-loader-0.1-{version}", "inheritsFrom": version, "mainClass": FABRIC_MAIN_CLASS,
+                "arguments": {"game": [], "jvm": []}, "libraries": [loader_library]
+            }).encode()
+        self.files["/manifest.json"] = json.dumps({"latest": {}, "versions": entries}).encode()
+
+
+@pytest.fixture(autouse=True)
+def server(monkeypatch):
+    repository = Repository()
+    server = start_server(repository)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    repository.build(base_url)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    # 与基准测试相同：让被测代码访问本地服务器，并清空进程内的缓存
+    saved = http_client._client, manifest_cache.manifest_cache, installer.RESOURCES_URL
+    http_client._client = http_client.HttpClient(mirrors=[])
+    manifest_cache.manifest_cache = manifest_cache.ManifestCache(manifest_url=base_url + "/manifest.json")
+    installer.RESOURCES_URL = base_url + "/resources"
+    monkeypatch.setattr(loaders.get_loader("fabric"), "meta_url", base_url + "/fabric")
+    object_store.__init__()
+    hash_cache.__init__()
+    yield server
+    http_client._client, manifest_cache.manifest_cache, installer.RESOURCES_URL = saved
+    server.shutdown()
+    server.server_close()
+
+
+def index_path():
+    return os.path.join(installer.assets_dir(), "indexes", "8.json")
+
+
+def test_upgrade_downloads_only_changed_files():
+    core.install_minecraft_version("old", "original", "old")
+    summary = upgrade_minecraft_version("old", "new")
+
+    # 共用的资源直接复用；客户端、索引和新资源需要下载
+    assert summary["downloaded_files"] == 3
+    assert summary["assets"] == {"added": 1, "changed": 0, "removed": 1, "unchanged": 1}
+    assert not os.path.exists(installer.version_dir("old"))
+    assert verify_minecraft_version("new") == []
+
+
+def test_upgrade_keeps_new_index_when_old_version_is_removed():
+    core.install_minecraft_version("old", "original", "old")
+    upgrade_minecraft_version("old", "new")
+
+    with open(index_path(), "r", encoding="utf-8") as f:
+        assert "minecraft/textures/new" in json.load(f)["objects"]
+    assert verify_minecraft_version("new") == []
+
+
+def test_failed_switch_rolls_back_to_old_version():
+    core.install_minecraft_version("old", "original", "old")
+
+    def switch(version_config):
+        raise LauncherError("database unavailable")
+    with pytest.raises(LauncherError):
+        upgrade_minecraft_version("old", "new", switch=switch)
+
+    assert not os.path.exists(installer.version_dir("new"))
+    assert verify_minecraft_version("old") == []
+    with open(index_path(), "r", encoding="utf-8") as f:
+        assert "minecraft/textures/old" in json.load(f)["objects"]
+
+
+def test_repair_restores_deleted_and_corrupt_files():
+    core.install_minecraft_version("old", "original", "old")
+    client_jar = os.path.join(installer.version_dir("old"), "old.jar")
+    with open(index_path(), "r", encoding="utf-8") as f:
+        hash_ = json.load(f)["objects"]["minecraft/textures/old"]["hash"]
+    os.remove(os.path.join(installer.assets_dir(), "objects", hash_[:2], hash_))
+    with open(client_jar, "r+b") as f:
+        f.write(b"corrupt")
+
+    assert len(core.repair_minecraft_version("old")) == 2
+    assert verify_minecraft_version("old") == []
+
+
+def upgrade_with_cli(keep_old):
+    from argparse import Namespace
+    from cli import command_upgrade
+    from data_store import InstalledDataStore
+    store = InstalledDataStore()
+    core.install_minecraft_version("old", "original", "old")
+    store.add_version("old", "old", "original")
+    assert command_upgrade(Namespace(old="old", new="new", keep_old=keep_old)) == 0
+    return [version["name"] for version in store.list_versions()]
+
+
+def test_cli_upgrade_replaces_version_record():
+    assert upgrade_with_cli(keep_old=False) == ["new"]
+
+
+def test_cli_upgrade_with_keep_old_keeps_old_record():
+    assert upgrade_with_cli(keep_old=True) == ["old", "new"]
+    assert os.path.isdir(installer.version_dir("old"))
+
+
+def main_class(version):
+    return load_launch_profile(version)["mainClass"]
+
+
+# 加载器版本安装到自己的目录，与原版互不覆盖，客户端使用原版目录中的文件
+def test_loader_and_game_version_are_installed_side_by_side():
+    assert core.install_minecraft_version("old", "fabric", "Fabric")["name"] == "old-fabric-0.1"
+    core.install_minecraft_version("old", "original", "old")
+
+    assert main_class("old-fabric-0.1") == FABRIC_MAIN_CLASS
+    assert main_class("old") == "net.minecraft.client.main.Main"
+    jvm_arguments = load_launch_profile("old-fabric-0.1")["jvmArguments"]
+    classpath = jvm_arguments[jvm_arguments.index("-cp") + 1].split(os.pathsep)
+    assert classpath[-1] == os.path.abspath(os.path.join(installer.version_dir("old"), "old.jar"))
+    assert verify_minecraft_version("old-fabric-0.1") == []
+    assert verify_minecraft_version("old") == []
+
+
+def test_removing_game_version_keeps_what_loader_version_inherits():
+    core.install_minecraft_version("old", "fabric", "Fabric")
+    core.install_minecraft_version("old", "original", "old")
+    installer.remove_version_files("old")
+
+    assert verify_minecraft_version("old-fabric-0.1") == []
+    assert main_class("old-fabric-0.1") == FABRIC_MAIN_CLASS
+    installer.remove_version_files("old-fabric-0.1")
+    assert not os.path.exists(installer.version_dir("old"))
+
+
+def test_upgrade_loader_version():
+    core.install_minecraft_version("old", "fabric", "old-fabric-0.1")
+    summary = upgrade_minecraft_version("old-fabric-0.1", "new")
+
+    assert summary["libraries"]["unchanged"] == 1
+    assert main_class("new-fabric-0.1") == FABRIC_MAIN_CLASS
+    assert verify_minecraft_version("new-fabric-0.1") == []
+    assert not os.path.exists(installer.version_dir("old-fabric-0.1"))
+    assert not os.path.exists(installer.version_dir("old"))
+
+
+def test_cli_records_loader_and_game_version_separately():
+    from argparse import Namespace
+    from cli import command_install
+    from data_store import InstalledDataStore
+    for install_type in ("fabric", "original"):
+        args = Namespace(versions=["old"], manifest=None, type=install_type, loader_version=None, jobs=1)
+        assert command_install(args) == 0
+
+    versions = InstalledDataStore().list_versions()
+    assert [(version["name"], version["type"]) for version in versions] == [
+        ("old-fabric-0.1", "fabric"), ("old", "original")
+    ]
+
+
+# 取消的新安装不留下加载器版本和原版的半成品
+def test_cancelled_loader_install_removes_partial_files():
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(DownloadCancelled):
+        core.install_minecraft_version("old", "fabric", "Fabric", cancel_event=cancel_event)
+
+    assert not os.path.exists(installer.version_dir("old-fabric-0.1"))
+    assert not os.path.exists(installer.version_dir("old"))
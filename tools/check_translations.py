@@ -0,0 +1,56 @@
+import os
+import re
+import sys
+import json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LANGUAGES_DIR = os.path.join(ROOT, "languages")
+REFERENCE_LANGUAGE = "english"
+# 界面代码中通过 language 字典下标引用翻译键
+KEY_PATTERN = re.compile(r"""language\[["'](\w+)["']\]""")
+
+
+# 收集所有 Python 源文件中使用到的翻译键
+def used_keys():
+    keys = {}
+    for directory, dirs, files in os.walk(ROOT):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for name in files:
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, "r", encoding="utf-8") as f:
+                for key in KEY_PATTERN.findall(f.read()):
+                    keys.setdefault(key, os.path.relpath(path, ROOT))
+    return keys
+
+
+def main():
+    keys = used_keys()
+    errors = []
+    for name in sorted(os.listdir(LANGUAGES_DIR)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(LANGUAGES_DIR, name), "r", encoding="utf-8") as f:
+            try:
+                catalog = json.load(f)
+            except json.JSONDecodeError as e:
+                errors.append(f"{name}: invalid JSON: {e}")
+                continue
+        # 英文是回退语言，必须包含全部键；其他语言缺少的键只给出警告
+        for key in sorted(set(keys) - set(catalog)):
+            message = f"{name}: missing key '{key}' (used in {keys[key]})"
+            if name == f"{REFERENCE_LANGUAGE}.json":
+                errors.append(message)
+            else:
+                print(f"Warning: {message}")
+        for key in sorted(set(catalog) - set(keys)):
+            print(f"Warning: {name}: unused key '{key}'")
+
+    for error in errors:
+        print(f"Error: {error}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
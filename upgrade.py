@@ -0,0 +1,96 @@
+import os
+import json
+from installer import version_dir, build_artifact_list, load_asset_index, asset_index_artifact
+from launch_profile import load_version_json, merge_version_json, library_key
+from integrity import check_artifact
+from object_store import object_store
+
+# 版本升级：比较新旧版本的资源索引和库列表，旧版本已有的文件直接复用，只下载新增或变化的文件
+
+
+# 按名称比较两组条目：新增、内容变化、删除、不变的数量
+def _diff(old, new):
+    return {
+        "added": sum(1 for key in new if key not in old),
+        "changed": sum(1 for key in new if key in old and old[key] != new[key]),
+        "removed": sum(1 for key in old if key not in new),
+        "unchanged": sum(1 for key in new if key in old and old[key] == new[key])
+    }
+
+
+def diff_asset_indexes(old_index, new_index):
+    return _diff(
+        {name: asset["hash"] for name, asset in old_index["objects"].items()},
+        {name: asset["hash"] for name, asset in new_index["objects"].items()}
+    )
+
+
+# 库按 group:artifact(:classifier) 比较，版本号或文件变化都算作变化
+def diff_libraries(old_json, new_json):
+    return _diff(
+        {library_key(library): library for library in old_json.get("libraries", [])},
+        {library_key(library): library for library in new_json.get("libraries", [])}
+    )
+
+
+def _load_installed(version):
+    version_json = load_version_json(version)
+    with open(asset_index_artifact(version_json)["path"], "r", encoding="utf-8") as f:
+        asset_index = json.load(f)
+    return version_json, asset_index
+
+
+# 计算升级计划：新版本的每个文件要么能从旧版本或对象库复用，要么需要下载
+# loader_plan 是新版本的模组加载器安装计划（见 loaders.prepare_loader）
+def plan_upgrade(old_version, new_version, new_version_json, loader_plan=None):
+    old_json, old_index = _load_installed(old_version)
+    new_index = load_asset_index(new_version_json)
+    old_artifacts = build_artifact_list(old_version, old_json, old_index)
+    new_artifacts = build_artifact_list(new_version, new_version_json, new_index)
+    if loader_plan:
+        new_artifacts.extend(loader_plan["artifacts"])
+        new_version_json = merge_version_json(new_version_json, loader_plan["profile"])
+
+    old_by_sha1 = {artifact["sha1"]: artifact for artifact in old_artifacts if artifact.get("sha1")}
+    old_paths = {artifact["path"] for artifact in old_artifacts}
+    reuse, download = [], []
+    for artifact in new_artifacts:
+        sha1 = artifact.get("sha1")
+        if sha1 and sha1 in old_by_sha1:
+            reuse.append((artifact, old_by_sha1[sha1]))
+        elif sha1 and object_store.has(sha1) or not sha1 and artifact["path"] in old_paths:
+            reuse.append((artifact, None))
+        else:
+            download.append(artifact)
+    return {
+        "reuse": reuse,
+        "download": download,
+        "assets": diff_asset_indexes(old_index, new_index),
+        "libraries": diff_libraries(old_json, new_version_json),
+    }
+
+
+# 把旧版本中可复用、但还不在对象库里的文件导入对象库，安装新版本时直接链接
+def seed_store(plan):
+    for artifact, old_artifact in plan["reuse"]:
+        sha1 = artifact.get("sha1")
+        if old_artifact is None or object_store.has(sha1):
+            continue
+        with object_store.object_lock(sha1):
+            if not object_store.has(sha1) and check_artifact(old_artifact):
+                object_store.adopt(sha1, old_artifact["path"])
+
+
+def summarize(plan):
+    return {
+        "reused_files": len(plan["reuse"]),
+        "reused_bytes": sum(artifact.get("size") or 0 for artifact, _ in plan["reuse"]),
+        "downloaded_files": len(plan["download"]),
+        "downloaded_bytes": sum(artifact.get("size") or 0 for artifact in plan["download"]),
+        "assets": plan["assets"],
+        "libraries": plan["libraries"]
+    }
+
+
+def is_installed(version):
+    return os.path.isfile(os.path.join(version_dir(version), "version.json"))
@@ -0,0 +1,74 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+VERSION_TYPES = ["release", "snapshot", "old_beta", "old_alpha"]
+
+
+# 清单条目的列式存储：每个字段一列，行号即条目编号；按类型预先建立索引
+class VersionTable:
+    def __init__(self, entries):
+        # 按发布时间从新到旧排列，之后的筛选结果天然有序
+        entries = sorted(entries, key=lambda entry: entry.get("releaseTime", ""), reverse=True)
+        self.ids = [entry["id"] for entry in entries]
+        self.search_keys = [version_id.lower() for version_id in self.ids]
+        self.types = [entry.get("type", "") for entry in entries]
+        self.release_dates = [entry.get("releaseTime", "")[:10] for entry in entries]
+        self.rows_by_type = {}
+        for row, version_type in enumerate(self.types):
+            self.rows_by_type.setdefault(version_type, []).append(row)
+        self._last_filter = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _rows_for_types(self, types):
+        if not types:
+            return range(len(self.ids))
+        rows = []
+        for version_type in types:
+            rows.extend(self.rows_by_type.get(version_type, []))
+        return sorted(rows)
+
+    # 返回符合条件的行号；查询串在上一次基础上追加字符时只在上一次结果中继续筛选
+    def filter(self, types=(), query="", newest_first=True):
+        types = tuple(types)
+        query = query.strip().lower()
+        last = self._last_filter
+        if last is not None and last[0] == types and query.startswith(last[1]):
+            candidates = last[2]
+        else:
+            candidates = self._rows_for_types(types)
+        rows = [row for row in candidates if query in self.search_keys[row]] if query else list(candidates)
+        self._last_filter = (types, query, rows)
+        return rows if newest_first else rows[::-1]
+
+
+# 只为可见行生成数据的版本列表模型，配合 QListView 使用
+class VersionListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = VersionTable([])
+        self.rows = []
+
+    def set_entries(self, entries):
+        self.beginResetModel()
+        self.table = VersionTable(entries)
+        self.rows = list(range(len(self.table)))
+        self.endResetModel()
+
+    def set_filter(self, types=(), query="", newest_first=True):
+        self.beginResetModel()
+        self.rows = self.table.filter(types, query, newest_first)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{self.table.ids[row]}    [{self.table.types[row]}, {self.table.release_dates[row]}]"
+        if role == Qt.UserRole:
+            return self.table.ids[row]
+        return None